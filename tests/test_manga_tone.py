@@ -0,0 +1,96 @@
+"""Test the LUT manga tone filter against the original multi-pass filter"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageEnhance, ImageOps
+
+from visionforge.services.manga_tone import manga_tone
+
+PANEL_SIZE = (800, 600)
+
+
+def reference_manga_panel(image: Image.Image) -> Image.Image:
+    """The original pipeline: three full-resolution passes, then resize"""
+    gray = image.convert('L')
+    high_contrast = ImageEnhance.Contrast(gray).enhance(1.5)
+    posterized = ImageOps.posterize(high_contrast, 4)
+    return posterized.convert('RGB').resize(PANEL_SIZE, Image.Resampling.LANCZOS)
+
+
+def lut_manga_panel(image: Image.Image) -> Image.Image:
+    """The export pipeline: grayscale, resize, one table lookup"""
+    return manga_tone(image.convert('L').resize(PANEL_SIZE, Image.Resampling.LANCZOS)).convert('RGB')
+
+
+def sample_scene(size=(1536, 1024)) -> Image.Image:
+    """Generated-art stand-in: color gradients with flat shapes and hard edges"""
+    width, height = size
+    image = Image.merge("RGB", [
+        Image.linear_gradient("L").resize(size),
+        Image.linear_gradient("L").rotate(90).resize(size),
+        Image.radial_gradient("L").resize(size)
+    ])
+    draw = ImageDraw.Draw(image)
+    for i in range(12):
+        x, y = (i * 131) % width, (i * 89) % height
+        draw.ellipse([x, y, x + width // 6, y + height // 5], fill=(40 * i % 256, 200, 90 + 13 * i))
+        draw.line([0, y, width, height - y], fill=(255, 255, 255), width=6)
+    return image
+
+
+def _pixels(image: Image.Image) -> list:
+    return list(image.convert('L').getdata())
+
+
+def test_lut_matches_reference_at_same_resolution():
+    """Folding contrast and posterize into one table is exact"""
+    image = sample_scene()
+    gray = image.convert('L')
+    reference = ImageOps.posterize(ImageEnhance.Contrast(gray).enhance(1.5), 4)
+    assert _pixels(manga_tone(image)) == _pixels(reference)
+
+
+def test_lut_panel_close_to_reference():
+    """Toning after the resize instead of before only moves edge pixels"""
+    reference = _pixels(reference_manga_panel(sample_scene()))
+    toned = _pixels(lut_manga_panel(sample_scene()))
+    differences = [abs(a - b) for a, b in zip(reference, toned)]
+    mean_difference = sum(differences) / len(differences)
+    changed = sum(1 for d in differences if d > 16) / len(differences)
+    print(f"   Mean difference: {mean_difference:.2f} gray levels")
+    print(f"   Pixels off by more than one tone: {changed:.2%}")
+    assert mean_difference < 4
+    assert changed < 0.05
+
+
+def benchmark_manga_tone(runs: int = 10):
+    """Print per-panel time for both pipelines"""
+    image = sample_scene()
+    for name, pipeline in (("Reference", reference_manga_panel), ("LUT", lut_manga_panel)):
+        pipeline(image)
+        start = time.perf_counter()
+        for _ in range(runs):
+            pipeline(image)
+        per_panel = (time.perf_counter() - start) / runs
+        print(f"   {name}: {per_panel * 1000:.1f} ms per panel")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Testing Manga Tone Filter")
+    print("=" * 50)
+
+    print("\n1. Exact match at full resolution...")
+    test_lut_matches_reference_at_same_resolution()
+    print("✅ Identical output")
+
+    print("\n2. Panel output vs original pipeline...")
+    test_lut_panel_close_to_reference()
+    print("✅ Within tolerance")
+
+    print("\n3. Benchmark (1536x1024 source, 800x600 panel)...")
+    benchmark_manga_tone()
+
+    print("\n" + "=" * 50)
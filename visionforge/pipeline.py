@@ -0,0 +1,214 @@
+"""VisionForge - Dependency-driven task graph for the forge pipeline"""
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .run_store import RunStore
+
+# Node statuses
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class TaskNode:
+    """A single unit of work in the forge graph (parse, portrait, DNA, scene, dialog)"""
+
+    def __init__(
+        self,
+        node_id: str,
+        run: Callable[[], Awaitable[Any]],
+        deps: Optional[List[str]] = None,
+        kind: str = "",
+        label: str = "",
+        weight: int = 1
+    ):
+        self.id = node_id
+        self.run = run
+        self.deps = list(deps or [])
+        self.kind = kind
+        self.label = label or node_id
+        self.weight = weight
+        self.status = PENDING
+        self.detail = ""
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TaskGraph:
+    """Runs nodes as soon as their dependencies are done, independent nodes in parallel
+
+    Nodes may be added while the graph is running (e.g. once the story is
+    parsed we know which portrait/DNA/scene nodes exist).
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, store: Optional[RunStore] = None):
+        """
+        Args:
+            limits: Optional max concurrency per node kind, e.g. {"portrait": 4}
+            store: Optional run store; finished nodes are checkpointed to it and
+                nodes already in it are restored instead of re-run
+        """
+        self.nodes: Dict[str, TaskNode] = {}
+        self.store = store
+        self._updated: List[TaskNode] = []
+        self._update_event: Optional[asyncio.Event] = None
+        self._cancelled = False
+        self._semaphores = {
+            kind: asyncio.Semaphore(max(limit, 1))
+            for kind, limit in (limits or {}).items()
+        }
+
+    def add(
+        self,
+        node_id: str,
+        run: Callable[[], Awaitable[Any]],
+        deps: Optional[List[str]] = None,
+        kind: str = "",
+        label: str = "",
+        weight: int = 1
+    ) -> TaskNode:
+        """Add a node. `run` is a zero-argument coroutine function."""
+        if node_id in self.nodes:
+            raise ValueError(f"Duplicate pipeline node: {node_id}")
+        node = TaskNode(node_id, run, deps, kind, label, weight)
+        self.nodes[node_id] = node
+        return node
+
+    def set_detail(self, node_id: str, detail: str):
+        """Attach a progress note to a running node (e.g. its queue position)
+
+        The node is re-yielded from run() with status RUNNING.
+        """
+        node = self.nodes[node_id]
+        node.detail = detail
+        if node not in self._updated:
+            self._updated.append(node)
+        if self._update_event is not None:
+            self._update_event.set()
+
+    def cancel(self):
+        """Stop the graph: running nodes are cancelled and nothing new starts
+
+        run() marks every unfinished node CANCELLED and returns without raising.
+        """
+        self._cancelled = True
+        if self._update_event is not None:
+            self._update_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def result(self, node_id: str) -> Any:
+        """Result of a finished node"""
+        return self.nodes[node_id].result
+
+    def statuses(self) -> Dict[str, str]:
+        """Per-node status, keyed by node id"""
+        return {node_id: node.status for node_id, node in self.nodes.items()}
+
+    def progress(self) -> int:
+        """Weighted percentage of finished nodes"""
+        total = sum(n.weight for n in self.nodes.values())
+        if not total:
+            return 0
+        done = sum(n.weight for n in self.nodes.values() if n.status == DONE)
+        return int(done * 100 / total)
+
+    def _ready(self) -> List[TaskNode]:
+        ready = []
+        for node in self.nodes.values():
+            if node.status != PENDING:
+                continue
+            missing = [d for d in node.deps if d not in self.nodes]
+            if missing:
+                raise ValueError(f"Pipeline node {node.id} depends on unknown nodes: {missing}")
+            if all(self.nodes[d].status == DONE for d in node.deps):
+                ready.append(node)
+        return ready
+
+    async def _execute(self, node: TaskNode) -> TaskNode:
+        if self.store is not None and self.store.has(node.id):
+            node.result = self.store.get(node.id)
+            return node
+
+        semaphore = self._semaphores.get(node.kind)
+        if semaphore is None:
+            node.result = await node.run()
+        else:
+            async with semaphore:
+                node.result = await node.run()
+
+        if self.store is not None:
+            self.store.put(node.id, node.result)
+        return node
+
+    async def run(self) -> AsyncIterator[TaskNode]:
+        """Run the graph, yielding each node as it finishes
+
+        Nodes whose detail changes are also yielded while still RUNNING;
+        check node.status. The consumer may add nodes between yields. If a
+        node fails, every unfinished node is marked CANCELLED, the running
+        ones are cancelled and awaited, and the failure is raised. After
+        cancel(), run() returns once the running nodes are cancelled.
+        """
+        running: Dict[asyncio.Task, TaskNode] = {}
+        self._update_event = asyncio.Event()
+        update_waiter: Optional[asyncio.Task] = None
+        try:
+            while not self._cancelled:
+                for node in self._ready():
+                    node.status = RUNNING
+                    running[asyncio.create_task(self._execute(node))] = node
+
+                if not running:
+                    break
+
+                if update_waiter is None or update_waiter.done():
+                    update_waiter = asyncio.create_task(self._update_event.wait())
+                finished, _ = await asyncio.wait(
+                    [*running, update_waiter],
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if self._update_event.is_set():
+                    self._update_event.clear()
+                    updated, self._updated = self._updated, []
+                    for node in updated:
+                        if node.status == RUNNING:
+                            yield node
+
+                for task in finished:
+                    if task is update_waiter:
+                        continue
+                    node = running.pop(task)
+                    if task.exception() is not None:
+                        node.status = FAILED
+                        node.error = task.exception()
+                        for other in self.nodes.values():
+                            if other.status in (PENDING, RUNNING):
+                                other.status = CANCELLED
+                        raise node.error
+                    node.status = DONE
+                    node.detail = ""
+                    yield node
+
+            if self._cancelled:
+                for node in self.nodes.values():
+                    if node.status in (PENDING, RUNNING):
+                        node.status = CANCELLED
+                return
+
+            stuck = [n.id for n in self.nodes.values() if n.status == PENDING]
+            if stuck:
+                raise ValueError(f"Pipeline nodes could not be scheduled: {stuck}")
+        finally:
+            for task in running:
+                task.cancel()
+            if update_waiter is not None:
+                update_waiter.cancel()
+            self._update_event = None
+            # Don't leave cancelled nodes running past the graph
+            await asyncio.gather(*running, return_exceptions=True)
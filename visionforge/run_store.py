@@ -0,0 +1,90 @@
+"""VisionForge - Local run store for checkpointed, resumable generation runs"""
+import json
+import os
+import time
+import uuid
+from typing import Any, Optional
+
+RUN_STORE_DIR = os.path.expanduser(os.getenv("VISIONFORGE_RUN_DIR", "~/.visionforge/runs"))
+
+# Oldest runs beyond this count are pruned when a new run starts
+RUN_STORE_MAX_RUNS = int(os.getenv("VISIONFORGE_MAX_RUNS", "20"))
+
+
+class RunStore:
+    """Persists the outputs of a generation run, one JSON file per run
+
+    Each finished pipeline node (parsed story, portrait URLs, DNAs, scene
+    URLs) is written as soon as it completes, so a failed run can resume
+    from the first incomplete step.
+    """
+
+    def __init__(self, run_id: str, root: str = RUN_STORE_DIR):
+        self.run_id = run_id
+        self.path = os.path.join(root, f"{run_id}.json")
+        self.data = {"meta": {}, "outputs": {}}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.data = json.load(f)
+
+    @classmethod
+    def create(cls, meta: dict, root: str = RUN_STORE_DIR) -> "RunStore":
+        """Start a new run with the inputs needed to resume it later"""
+        os.makedirs(root, exist_ok=True)
+        _prune_runs(root, RUN_STORE_MAX_RUNS - 1)
+        store = cls(uuid.uuid4().hex, root)
+        store.data["meta"] = dict(meta, created_at=time.time())
+        store._save()
+        return store
+
+    @classmethod
+    def load(cls, run_id: str, root: str = RUN_STORE_DIR) -> Optional["RunStore"]:
+        """Open an existing run, or None if it no longer exists"""
+        if not run_id or not os.path.exists(os.path.join(root, f"{run_id}.json")):
+            return None
+        return cls(run_id, root)
+
+    @property
+    def meta(self) -> dict:
+        return self.data["meta"]
+
+    def has(self, key: str) -> bool:
+        return key in self.data["outputs"]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data["outputs"].get(key, default)
+
+    def put(self, key: str, value: Any):
+        """Checkpoint an output (must be JSON-serializable)"""
+        self.data["outputs"][key] = value
+        self._save()
+
+    def mark_complete(self):
+        self.data["meta"]["completed_at"] = time.time()
+        self._save()
+
+    @property
+    def is_complete(self) -> bool:
+        return "completed_at" in self.data["meta"]
+
+    def _save(self):
+        # Write to a temp file and swap so a crash never leaves a torn checkpoint
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+
+def _prune_runs(root: str, keep: int):
+    """Delete the oldest run files so at most `keep` remain"""
+    runs = [
+        os.path.join(root, name) for name in os.listdir(root)
+        if name.endswith(".json")
+    ]
+    runs.sort(key=os.path.getmtime, reverse=True)
+    for path in runs[max(keep, 0):]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
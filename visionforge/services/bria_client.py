@@ -0,0 +1,268 @@
+"""VisionForge - Async Bria API client with a shared keep-alive connection pool"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from .circuit_breaker import get_breaker
+
+load_dotenv()
+
+BRIA_API_URL = "https://engine.prod.bria-api.com/v2/image/generate"
+BRIA_API_TOKEN = os.getenv("BRIA_API_TOKEN", "")
+
+# Timeouts in seconds. Sync generations take 10-30s, so the read timeout is generous.
+BRIA_CONNECT_TIMEOUT = float(os.getenv("BRIA_CONNECT_TIMEOUT", "10"))
+BRIA_READ_TIMEOUT = float(os.getenv("BRIA_READ_TIMEOUT", "120"))
+
+# Connection pool shared by every session in this worker process
+BRIA_MAX_CONNECTIONS = int(os.getenv("BRIA_MAX_CONNECTIONS", "32"))
+BRIA_MAX_KEEPALIVE = int(os.getenv("BRIA_MAX_KEEPALIVE", "16"))
+
+# Status polling for sync=False jobs: poll fast early, back off later
+BRIA_POLL_INITIAL = float(os.getenv("BRIA_POLL_INITIAL", "0.5"))
+BRIA_POLL_MAX = float(os.getenv("BRIA_POLL_MAX", "5"))
+BRIA_POLL_BACKOFF = float(os.getenv("BRIA_POLL_BACKOFF", "1.5"))
+BRIA_JOB_DEADLINE = float(os.getenv("BRIA_JOB_DEADLINE", "300"))
+
+
+class BriaAPIError(ValueError):
+    """Raised when the Bria API rejects or fails a request"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: Optional[bool] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        if retryable is None:
+            # Timeouts and connection errors have no status code
+            retryable = status_code is None or status_code == 429 or status_code >= 500
+        self.retryable = retryable
+
+
+class BriaClient:
+    """asyncio-native Bria client
+
+    Requests can be cancelled by cancelling the awaiting task; the underlying
+    connection is released back to the pool.
+    """
+
+    def __init__(self, api_token: str = BRIA_API_TOKEN):
+        self._client = httpx.AsyncClient(
+            headers={
+                "Content-Type": "application/json",
+                "api_token": api_token
+            },
+            timeout=httpx.Timeout(
+                BRIA_READ_TIMEOUT,
+                connect=BRIA_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=BRIA_MAX_CONNECTIONS,
+                max_keepalive_connections=BRIA_MAX_KEEPALIVE
+            )
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def generate(self, payload: dict) -> dict:
+        """POST a generation request
+
+        Args:
+            payload: Bria v2 generation payload
+
+        Returns:
+            Parsed JSON response body
+        """
+        return await self._request("POST", BRIA_API_URL, json=payload)
+
+    async def status(self, status_url: str) -> dict:
+        """GET the status of a sync=False job"""
+        return await self._request("GET", status_url)
+
+    async def _request(self, method: str, url: str, **kwargs) -> dict:
+        try:
+            response = await self._client.request(method, url, **kwargs)
+        except httpx.TimeoutException as e:
+            raise BriaAPIError(f"Bria API timed out ({type(e).__name__})") from e
+        except httpx.TransportError as e:
+            raise BriaAPIError(f"Bria API connection failed: {e}") from e
+
+        if response.status_code == 401:
+            raise BriaAPIError(
+                "Bria API authentication failed. Please check your BRIA_API_TOKEN in .env file. "
+                "Get a new token at https://platform.bria.ai/",
+                status_code=401
+            )
+
+        if response.status_code == 429:
+            raise BriaAPIError(
+                "Bria API rate limit reached. Please wait a moment and try again.",
+                status_code=429
+            )
+
+        if not response.is_success:
+            error_msg = response.text[:200] if response.text else f"HTTP {response.status_code}"
+            raise BriaAPIError(f"Bria API error: {error_msg}", status_code=response.status_code)
+
+        return response.json()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class _Job:
+    """An outstanding sync=False generation"""
+
+    def __init__(self, future: asyncio.Future, deadline: float):
+        self.future = future
+        self.deadline = deadline
+        self.interval = BRIA_POLL_INITIAL
+        self.next_poll = time.monotonic() + BRIA_POLL_INITIAL
+
+
+class BriaPoller:
+    """Polls many outstanding Bria jobs from one task over the shared client
+
+    Each job gets a future that resolves with the job's result (or raises
+    BriaAPIError) when it completes, fails or passes its deadline.
+    """
+
+    def __init__(self, client: BriaClient):
+        self.client = client
+        self._jobs: Dict[str, _Job] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    async def wait(self, status_url: str, timeout: float = BRIA_JOB_DEADLINE) -> dict:
+        """Wait for a job to finish and return its result"""
+        job = self._jobs.get(status_url)
+        if job is None:
+            future = asyncio.get_running_loop().create_future()
+            job = _Job(future, time.monotonic() + timeout)
+            self._jobs[status_url] = job
+            self._wakeup.set()
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._run())
+        # Shield so one cancelled waiter doesn't cancel the job for others
+        return await asyncio.shield(job.future)
+
+    async def _run(self):
+        while self._jobs:
+            now = time.monotonic()
+            due = [url for url, job in self._jobs.items() if job.next_poll <= now]
+            if due:
+                results = await asyncio.gather(
+                    *(self._poll(url) for url in due),
+                    return_exceptions=True
+                )
+                for url, result in zip(due, results):
+                    try:
+                        self._update(url, result)
+                    except Exception as e:
+                        # A malformed status fails its own job, never the poller
+                        if not isinstance(e, BriaAPIError):
+                            e = BriaAPIError(f"Unreadable Bria status response: {e!r}", retryable=False)
+                        self._finish(url, error=e)
+            # Deadlines hold whether or not the last poll got through
+            self._expire(time.monotonic())
+
+            if not self._jobs:
+                break
+            wake_at = min(min(job.next_poll, job.deadline) for job in self._jobs.values())
+            delay = max(wake_at - time.monotonic(), 0)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, status_url: str) -> dict:
+        # Each status request counts toward the Bria breaker on its own, so a
+        # long wait never holds it; while open, polls fail fast and back off
+        with get_breaker("bria").guard():
+            return await self.client.status(status_url)
+
+    def _update(self, status_url: str, status):
+        """Resolve the job if its status is final, otherwise schedule the next poll"""
+        job = self._jobs[status_url]
+
+        if isinstance(status, BaseException):
+            # Transient poll failure: keep the job and retry after backing off
+            state = None
+        elif not isinstance(status, dict):
+            raise BriaAPIError(f"Unexpected Bria status response: {str(status)[:200]}", retryable=False)
+        else:
+            state = status.get("status")
+
+        if state == "COMPLETED":
+            if "result" not in status:
+                raise BriaAPIError("Bria reported the job completed without a result", retryable=False)
+            self._finish(status_url, result=status["result"])
+        elif state in ("ERROR", "FAILED"):
+            self._finish(
+                status_url,
+                error=BriaAPIError(f"Generation failed: {status.get('error')}", retryable=False)
+            )
+        else:
+            job.interval = min(job.interval * BRIA_POLL_BACKOFF, BRIA_POLL_MAX)
+            job.next_poll = time.monotonic() + job.interval
+
+    def _expire(self, now: float):
+        for status_url, job in list(self._jobs.items()):
+            if now >= job.deadline:
+                self._finish(
+                    status_url,
+                    error=BriaAPIError("Bria generation timed out waiting for the result", retryable=False)
+                )
+
+    def _finish(self, status_url: str, result=None, error: Optional[BaseException] = None):
+        job = self._jobs.pop(status_url, None)
+        if job is None or job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+
+_client: Optional[BriaClient] = None
+_poller: Optional[BriaPoller] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_bria_client() -> BriaClient:
+    """Shared client for the running event loop (one pool per worker process)"""
+    global _client, _poller, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = BriaClient()
+        _poller = None
+        _client_loop = loop
+    return _client
+
+
+def get_bria_poller() -> BriaPoller:
+    """Shared status poller using the shared client"""
+    global _poller
+    client = get_bria_client()
+    if _poller is None:
+        _poller = BriaPoller(client)
+    return _poller
+
+
+async def close_bria_client():
+    """Close the shared client and its pooled connections"""
+    global _client, _poller, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _poller = None
+    _client_loop = None
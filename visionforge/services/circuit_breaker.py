@@ -0,0 +1,169 @@
+"""VisionForge - Circuit breakers for external providers (Bria, Gemini, Luma)"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Open after this many failures within the window (seconds)
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("VISIONFORGE_BREAKER_FAILURES", "5"))
+BREAKER_WINDOW = float(os.getenv("VISIONFORGE_BREAKER_WINDOW", "60"))
+# How long to reject calls before letting a probe through
+BREAKER_RESET_TIMEOUT = float(os.getenv("VISIONFORGE_BREAKER_RESET", "30"))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised immediately while a provider's circuit is open"""
+
+    retryable = False
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(
+            f"{provider} is currently unavailable, so requests are paused. "
+            f"Please try again in {max(int(retry_in), 1)}s."
+        )
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe -> closed
+
+    Thread-safe, since Gemini and Luma calls run in worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        window: float = BREAKER_WINDOW,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        is_failure: Optional[Callable[[BaseException], bool]] = None
+    ):
+        """
+        Args:
+            name: Provider name shown to users
+            failure_threshold: Failures within `window` that open the circuit
+            window: Sliding window for counting failures (seconds)
+            reset_timeout: Seconds to stay open before a half-open probe
+            is_failure: Decides which exceptions count against the provider
+                (default: all). Caller mistakes like bad requests shouldn't.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda e: True)
+        self._state = CLOSED
+        self._failures: deque = deque()
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def reject_if_open(self):
+        """Fail fast while open, without claiming the half-open probe"""
+        with self._lock:
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if self._state == OPEN and remaining > 0:
+                raise CircuitOpenError(self.name, remaining)
+
+    def before_call(self):
+        """Reject the call if the circuit is open; admit one probe when half-open"""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN:
+                remaining = self.reset_timeout - (now - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError(self.name, self.reset_timeout)
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures.clear()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """A call ended without telling us anything about the provider"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, error: BaseException):
+        if not self.is_failure(error):
+            # Not the provider's fault, but a half-open probe still finished
+            self.release_probe()
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                self._trip(now)
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if len(self._failures) >= self.failure_threshold:
+                self._trip(now)
+
+    def _trip(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._failures.clear()
+        self._probe_in_flight = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """Wrap one provider call (works around awaits too)"""
+        self.before_call()
+        try:
+            yield
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            # Cancelled (e.g. a losing hedge)
+            self.release_probe()
+            raise
+        else:
+            self.record_success()
+
+
+def _provider_fault(error: BaseException) -> bool:
+    # Timeouts, connection errors, 429 and 5xx flag themselves as retryable;
+    # other errors count unless they say otherwise
+    return bool(getattr(error, "retryable", True))
+
+
+BREAKERS: Dict[str, CircuitBreaker] = {
+    "bria": CircuitBreaker("Bria", is_failure=_provider_fault),
+    # Unparseable JSON is a bad response, not an outage
+    "gemini": CircuitBreaker("Gemini", is_failure=lambda e: not isinstance(e, ValueError)),
+    # Luma keys are per user: a bad key or a rejected generation is not an outage
+    "luma": CircuitBreaker("Luma", is_failure=_provider_fault),
+}
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    return BREAKERS[provider]
+
+
+def breaker_states() -> Dict[str, str]:
+    """Current circuit state per provider, keyed by display name"""
+    return {breaker.name: breaker.state for breaker in BREAKERS.values()}
@@ -1,30 +1,32 @@
 """VisionForge - Export Service for Manga and Manhwa"""
-from PIL import Image, ImageDraw, ImageFont, ImageOps, ImageEnhance
-import requests
-from io import BytesIO
+from PIL import Image, ImageDraw, ImageFont
 import os
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
+from .image_fetch import fetch_image, fetch_image_bytes
+from .manga_tone import manga_tone
 
-def download_image(url: str) -> Image.Image:
-    """Download image from URL"""
-    response = requests.get(url)
-    return Image.open(BytesIO(response.content)).convert('RGB')
+# Threads fetching and preparing panels for one export; downloads per host
+# are capped separately by the image cache (IMAGE_FETCH_PER_HOST)
+EXPORT_WORKERS = int(os.getenv("VISIONFORGE_EXPORT_WORKERS", "8"))
 
 
-def convert_to_manga_style(image: Image.Image) -> Image.Image:
-    """Convert color image to manga-style black & white"""
-    # Convert to grayscale
-    gray = image.convert('L')
+def download_image(url: str) -> Image.Image:
+    """Download image from URL"""
+    return fetch_image(url, 'RGB')
 
-    # Increase contrast for manga look
-    enhancer = ImageEnhance.Contrast(gray)
-    high_contrast = enhancer.enhance(1.5)
 
-    # Apply slight posterize effect for cel-shaded look
-    posterized = ImageOps.posterize(high_contrast, 4)
+def _prepare_all(prepare, items: list) -> list:
+    """Run prepare(item) for every item concurrently; results keep item order
 
-    return posterized.convert('RGB')
+    Used to fetch, decode and resize every panel before compositing, so an
+    export waits on its slowest download instead of the sum of them all.
+    """
+    if len(items) <= 1:
+        return [prepare(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(EXPORT_WORKERS, len(items))) as pool:
+        return list(pool.map(prepare, items))
 
 
 def create_manga_panel(
@@ -50,6 +52,14 @@ def create_manga_panel(
     """
     num_images = len(images)
 
+    def prepare_panel(url: str) -> Image.Image:
+        # Tone the downscaled grayscale panel rather than the full-size color
+        # original; paste() converts it to RGB
+        img = fetch_image(url, 'L').resize(panel_size, Image.Resampling.LANCZOS)
+        return manga_tone(img)
+
+    panels = _prepare_all(prepare_panel, images)
+
     # Calculate layout (2 columns for manga)
     cols = 2
     rows = (num_images + 1) // 2
@@ -68,18 +78,13 @@ def create_manga_panel(
     except:
         font = ImageFont.load_default()
 
-    for i, (img_url, title) in enumerate(zip(images, titles)):
+    for i, (img, title) in enumerate(zip(panels, titles)):
         row = i // cols
         col = i % cols
 
         x = gap + col * (panel_size[0] + gap)
         y = gap + row * (panel_size[1] + gap)
 
-        # Download and process image
-        img = download_image(img_url)
-        img = convert_to_manga_style(img)
-        img = img.resize(panel_size, Image.Resampling.LANCZOS)
-
         # Draw border
         draw.rectangle(
             [x - border, y - border, x + panel_size[0] + border, y + panel_size[1] + border],
@@ -145,14 +150,14 @@ def create_manhwa_scroll(
         Path to saved manhwa image
     """
     # Download all images first to calculate heights
-    downloaded = []
-    for url in images:
+    def prepare_panel(url: str) -> Image.Image:
         img = download_image(url)
         # Resize to fixed width, maintain aspect ratio
         ratio = panel_width / img.width
         new_height = int(img.height * ratio)
-        img = img.resize((panel_width, new_height), Image.Resampling.LANCZOS)
-        downloaded.append(img)
+        return img.resize((panel_width, new_height), Image.Resampling.LANCZOS)
+
+    downloaded = _prepare_all(prepare_panel, images)
 
     # Calculate total height (images + titles + gaps)
     title_height = 60
@@ -238,18 +243,20 @@ def export_all_images(scenes: list, characters: list, output_dir: str) -> str:
     os.makedirs(output_dir, exist_ok=True)
     zip_path = os.path.join(output_dir, "visionforge_images.zip")
 
+    # Archive name and URL of every character and scene image
+    entries = []
+    for i, char in enumerate(characters):
+        if char.image_url:
+            entries.append((f"characters/{char.name}_{i+1}.png", char.image_url))
+    for i, scene in enumerate(scenes):
+        if scene.image_url:
+            safe_title = "".join(c for c in scene.title if c.isalnum() or c in (' ', '_')).strip()
+            entries.append((f"scenes/scene_{i+1}_{safe_title[:30]}.png", scene.image_url))
+
+    # Download everything concurrently, then write the archive in order
+    images = _prepare_all(fetch_image_bytes, [url for _, url in entries])
     with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Download and add character images
-        for i, char in enumerate(characters):
-            if char.image_url:
-                img_data = requests.get(char.image_url).content
-                zipf.writestr(f"characters/{char.name}_{i+1}.png", img_data)
-
-        # Download and add scene images
-        for i, scene in enumerate(scenes):
-            if scene.image_url:
-                img_data = requests.get(scene.image_url).content
-                safe_title = "".join(c for c in scene.title if c.isalnum() or c in (' ', '_')).strip()
-                zipf.writestr(f"scenes/scene_{i+1}_{safe_title[:30]}.png", img_data)
+        for (name, _), img_data in zip(entries, images):
+            zipf.writestr(name, img_data)
 
     return zip_path
@@ -1,15 +1,21 @@
 """FIBO Image Generation Service via Bria API"""
+import asyncio
 import os
-import time
-import requests
-from dotenv import load_dotenv
-from PIL import Image
-from io import BytesIO
+from typing import Callable, Optional
 
-load_dotenv()
+from .bria_client import get_bria_client, get_bria_poller
+from .circuit_breaker import get_breaker
+from .prompt_compiler import build_character_description, get_prompt_compiler  # noqa: F401 (re-exported)
+from .rate_limiter import get_bria_admission
+from .retry import call_with_retry
+from .result_cache import ResultCache, canonical_key
 
-BRIA_API_URL = "https://engine.prod.bria-api.com/v2/image/generate"
-BRIA_API_TOKEN = os.getenv("BRIA_API_TOKEN", "")
+# Generated images are cached per request. Bria result URLs expire,
+# so keep the TTL well under their lifetime.
+FIBO_CACHE_TTL = float(os.getenv("FIBO_CACHE_TTL", str(12 * 60 * 60)))
+FIBO_CACHE_MAX_ENTRIES = int(os.getenv("FIBO_CACHE_MAX_ENTRIES", "2000"))
+
+_result_cache: Optional[ResultCache] = None
 
 # Style-specific prompt enhancements
 STYLE_PROMPTS = {
@@ -20,54 +26,109 @@ STYLE_PROMPTS = {
 }
 
 
-def generate_image(prompt: str, style: str = "anime", aspect_ratio: str = "1:1") -> dict:
-    """Generate an image using FIBO via Bria API
-
-    Args:
-        prompt: Text description of the image
-        style: Art style (anime, realistic, sci-fi, fantasy)
-        aspect_ratio: Image aspect ratio (1:1, 16:9, 9:16, etc.)
-
-    Returns:
-        Dict with image_url, seed, and structured_prompt
-    """
+def _build_payload(prompt: str, style: str, aspect_ratio: str, sync: bool) -> dict:
+    """Build the Bria generation payload for a prompt and style"""
     style_suffix = STYLE_PROMPTS.get(style.lower(), STYLE_PROMPTS["anime"])
     full_prompt = f"{prompt}, {style_suffix}, high quality, masterpiece"
 
-    headers = {
-        "Content-Type": "application/json",
-        "api_token": BRIA_API_TOKEN
-    }
-
-    payload = {
+    return {
         "prompt": full_prompt,
         "model_version": "FIBO",
         "aspect_ratio": aspect_ratio,
-        "sync": True,
+        "sync": sync,
         "guidance_scale": 5,
         "steps_num": 50
     }
 
-    response = requests.post(BRIA_API_URL, json=payload, headers=headers)
 
-    if response.status_code == 401:
-        raise ValueError(f"Bria API authentication failed. Please check your BRIA_API_TOKEN in .env file. Get a new token at https://platform.bria.ai/")
+def _get_result_cache() -> ResultCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache("fibo_results", FIBO_CACHE_TTL, FIBO_CACHE_MAX_ENTRIES)
+    return _result_cache
+
+
+def _cache_key(payload: dict) -> str:
+    """Hash of everything that determines the generated image"""
+    return canonical_key({
+        "prompt": " ".join(payload["prompt"].split()),
+        "model_version": payload["model_version"],
+        "aspect_ratio": payload["aspect_ratio"],
+        "guidance_scale": payload["guidance_scale"],
+        "steps_num": payload["steps_num"]
+    })
+
+
+async def generate_image(
+    prompt: str,
+    style: str = "anime",
+    aspect_ratio: str = "1:1",
+    fresh: bool = False,
+    sync: bool = True,
+    on_queue: Optional[Callable[[int], None]] = None,
+    call_site: str = "default"
+) -> dict:
+    """Generate an image using FIBO via Bria API
 
-    if not response.ok:
-        error_msg = response.text[:200] if response.text else f"HTTP {response.status_code}"
-        raise ValueError(f"Bria API error: {error_msg}")
+    Identical requests are served from the result cache.
 
-    result = response.json()
-    return {
-        "image_url": result["result"]["image_url"],
-        "seed": result["result"].get("seed"),
-        "structured_prompt": result["result"].get("structured_prompt")
+    Args:
+        prompt: Text description of the image
+        style: Art style (anime, realistic, sci-fi, fantasy)
+        aspect_ratio: Image aspect ratio (1:1, 16:9, 9:16, etc.)
+        fresh: Skip the cache lookup to get a new variation
+        sync: If False, submit with sync=False and wait on the shared status poller
+        on_queue: Called with the number of requests ahead while rate limited
+        call_site: Retry/hedging policy to use (see retry.RETRY_POLICIES)
+
+    Returns:
+        Dict with image_url, seed, and structured_prompt
+    """
+    payload = _build_payload(prompt, style, aspect_ratio, sync=sync)
+    key = _cache_key(payload)
+
+    # SQLite can block on its lock, so keep the cache off the event loop
+    if not fresh:
+        cached = await asyncio.to_thread(_get_result_cache().get, key)
+        if cached is not None:
+            return cached
+
+    breaker = get_breaker("bria")
+
+    async def admit():
+        # Don't queue behind the rate limit for a provider that's down
+        breaker.reject_if_open()
+
+        # Wait for our turn under the shared rate limit
+        await get_bria_admission().acquire(on_queue)
+
+    async def submit() -> dict:
+        # Only the HTTP requests count toward the breaker: the generate call
+        # here, and each status request inside the poller
+        with breaker.guard():
+            response = await get_bria_client().generate(payload)
+        if "result" in response:
+            return response["result"]
+        return await get_bria_poller().wait(response["status_url"])
+
+    # Transient failures are retried, and slow calls optionally hedged
+    result = await call_with_retry(submit, call_site, admit=admit)
+
+    image = {
+        "image_url": result["image_url"],
+        "seed": result.get("seed"),
+        "structured_prompt": result.get("structured_prompt")
     }
+    await asyncio.to_thread(_get_result_cache().set, key, image)
+    return image
 
 
-def generate_image_async(prompt: str, style: str = "anime", aspect_ratio: str = "1:1") -> dict:
+async def generate_image_async(prompt: str, style: str = "anime", aspect_ratio: str = "1:1") -> dict:
     """Generate an image asynchronously (for long operations)
 
+    The job is submitted with sync=False and tracked by the shared status
+    poller, so many jobs can be outstanding at once.
+
     Args:
         prompt: Text description of the image
         style: Art style
@@ -76,173 +137,66 @@ def generate_image_async(prompt: str, style: str = "anime", aspect_ratio: str =
     Returns:
         Dict with image_url, seed, and structured_prompt
     """
-    style_suffix = STYLE_PROMPTS.get(style.lower(), STYLE_PROMPTS["anime"])
-    full_prompt = f"{prompt}, {style_suffix}, high quality, masterpiece"
-
-    headers = {
-        "Content-Type": "application/json",
-        "api_token": BRIA_API_TOKEN
-    }
-
-    payload = {
-        "prompt": full_prompt,
-        "model_version": "FIBO",
-        "aspect_ratio": aspect_ratio,
-        "sync": False,
-        "guidance_scale": 5,
-        "steps_num": 50
-    }
-
-    # Initial request
-    response = requests.post(BRIA_API_URL, json=payload, headers=headers)
-    response.raise_for_status()
-    data = response.json()
-
-    # Poll for completion
-    status_url = data.get("status_url")
-    if status_url:
-        while True:
-            status_response = requests.get(status_url, headers=headers)
-            status_data = status_response.json()
-
-            if status_data.get("status") == "COMPLETED":
-                return {
-                    "image_url": status_data["result"]["image_url"],
-                    "seed": status_data["result"].get("seed"),
-                    "structured_prompt": status_data["result"].get("structured_prompt")
-                }
-            elif status_data.get("status") == "ERROR":
-                raise Exception(f"Generation failed: {status_data.get('error')}")
+    return await generate_image(prompt, style, aspect_ratio, sync=False)
 
-            time.sleep(1)
 
-    return data
-
-
-def generate_character_portrait(description: str, style: str = "anime") -> str:
+async def generate_character_portrait(
+    description: str,
+    style: str = "anime",
+    fresh: bool = False,
+    on_queue: Optional[Callable[[int], None]] = None
+) -> str:
     """Generate a character portrait for DNA extraction
 
     Args:
         description: Detailed character description
         style: Art style
+        fresh: Bypass the result cache for a new variation
+        on_queue: Called with the queue position while rate limited
 
     Returns:
         URL of the generated portrait
     """
     portrait_prompt = f"{description}, character portrait, detailed face, upper body, centered composition, clean background"
-    result = generate_image(portrait_prompt, style)
+    result = await generate_image(
+        portrait_prompt, style,
+        fresh=fresh, on_queue=on_queue, call_site="portrait"
+    )
     return result["image_url"]
 
 
-def build_character_description(dna: dict) -> str:
-    """Convert Character DNA JSON to text description for prompt injection
-
-    Args:
-        dna: Character DNA dictionary
-
-    Returns:
-        Text description for use in prompts
-    """
-    parts = []
-
-    # Name
-    if 'name' in dna:
-        parts.append(dna['name'])
-
-    # Physical features
-    if 'physical_features' in dna:
-        pf = dna['physical_features']
-
-        if 'hair' in pf:
-            hair = pf['hair']
-            hair_desc = f"{hair.get('color', '')} {hair.get('style', '')} hair"
-            if hair.get('texture'):
-                hair_desc += f" with {hair['texture']} texture"
-            parts.append(hair_desc)
-
-        if 'eyes' in pf:
-            eyes = pf['eyes']
-            eye_desc = f"{eyes.get('color', '')} {eyes.get('shape', '')} eyes"
-            if eyes.get('features') and eyes['features'] != 'none':
-                eye_desc += f" with {eyes['features']}"
-            parts.append(eye_desc)
-
-        if 'face' in pf:
-            face = pf['face']
-            if 'skin_tone' in face:
-                parts.append(f"{face['skin_tone']} skin")
-            if face.get('distinctive_marks') and face['distinctive_marks'] != 'none':
-                parts.append(face['distinctive_marks'])
-            if 'structure' in face:
-                parts.append(face['structure'])
-
-        if 'body' in pf:
-            body = pf['body']
-            if 'build' in body:
-                parts.append(f"{body['build']} build")
-
-    # Clothing
-    if 'clothing' in dna:
-        clothing = dna['clothing']
-        if 'default_outfit' in clothing:
-            parts.append(f"wearing {clothing['default_outfit']}")
-        if clothing.get('accessories'):
-            acc_list = clothing['accessories']
-            if acc_list and acc_list[0]:
-                parts.append(f"with {', '.join(acc_list)}")
-        if clothing.get('weapons') and clothing['weapons'] != 'none':
-            parts.append(clothing['weapons'])
-
-    return ", ".join(filter(None, parts))
-
-
-def generate_scene_with_characters(
+async def generate_scene_with_characters(
     scene_description: str,
     character_dnas: list,
-    style: str = "anime"
+    style: str = "anime",
+    fresh: bool = False,
+    on_queue: Optional[Callable[[int], None]] = None,
+    call_site: str = "scene"
 ) -> str:
     """Generate a scene with consistent characters using their DNA
 
+    Scenes are submitted with sync=False so a whole story's scenes can be
+    in flight together and collected as they land.
+
     Args:
         scene_description: Description of the scene/setting
         character_dnas: List of Character DNA dictionaries for characters in scene
         style: Art style
+        fresh: Bypass the result cache for a new variation
+        on_queue: Called with the queue position while rate limited
+        call_site: Retry/hedging policy ("scene", or "regenerate" from the UI)
 
     Returns:
         URL of the generated image
     """
-    # Build character descriptions from DNA
-    char_descriptions = []
-    for dna in character_dnas:
-        char_desc = build_character_description(dna)
-        if char_desc:
-            char_descriptions.append(char_desc)
-
-    # Combine character + scene + style
-    if char_descriptions:
-        full_prompt = f"{', '.join(char_descriptions)}, {scene_description}"
-    else:
-        full_prompt = scene_description
-
-    # Add consistency keywords
-    full_prompt += ", consistent character design, same characters throughout"
-
-    result = generate_image(full_prompt, style, aspect_ratio="16:9")
-    return result["image_url"]
+    # Character fragments are compiled once per DNA version and reused
+    full_prompt = get_prompt_compiler().scene_prompt(scene_description, character_dnas)
 
-
-def download_image(url: str) -> Image.Image:
-    """Download an image from URL and return as PIL Image
-
-    Args:
-        url: Image URL
-
-    Returns:
-        PIL Image object
-    """
-    response = requests.get(url)
-    response.raise_for_status()
-    return Image.open(BytesIO(response.content))
+    result = await generate_image(
+        full_prompt, style, aspect_ratio="16:9",
+        fresh=fresh, sync=False, on_queue=on_queue, call_site=call_site
+    )
+    return result["image_url"]
 
 
 # Test
@@ -250,7 +204,7 @@ if __name__ == "__main__":
     print("Testing FIBO service via Bria API...")
     print("Generating test image...")
     try:
-        result = generate_image("anime samurai with silver hair, dramatic pose, sunset background")
+        result = asyncio.run(generate_image("anime samurai with silver hair, dramatic pose, sunset background"))
         print(f"Generated: {result['image_url']}")
     except Exception as e:
         print(f"Error: {e}")
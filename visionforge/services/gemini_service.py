@@ -1,12 +1,94 @@
 """Gemini LLM Service for story parsing and DNA extraction"""
 import os
 import json
+import hashlib
+import functools
+import inspect
+from typing import Optional
 from dotenv import load_dotenv
 import google.generativeai as genai
+from PIL import Image
+
+from .circuit_breaker import get_breaker
+from .result_cache import ResultCache, canonical_key
+from .vision_input import image_mime_type
 
 load_dotenv()
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
+GEMINI_MODEL = 'gemini-2.0-flash'
+
+# Bump a template's version whenever its prompt text changes, so old
+# cached responses stop matching
+PROMPT_VERSIONS = {
+    "parse_story": 1,
+    "story_name": 1,
+    "character_dna": 1,
+    "scene_dialog": 1,
+}
+
+GEMINI_CACHE_TTL = float(os.getenv("GEMINI_CACHE_TTL", str(30 * 24 * 60 * 60)))
+GEMINI_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "5000"))
+
+_response_cache: Optional[ResultCache] = None
+
+
+def _get_response_cache() -> ResultCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResultCache("gemini_responses", GEMINI_CACHE_TTL, GEMINI_CACHE_MAX_ENTRIES)
+    return _response_cache
+
+
+def _cache_input(value):
+    """Make an argument hashable for the cache key; images key on a content hash"""
+    if isinstance(value, Image.Image):
+        digest = hashlib.sha256(value.tobytes())
+        digest.update(f"{value.mode}{value.size}".encode())
+        return {"image_sha256": digest.hexdigest()}
+    if isinstance(value, (bytes, bytearray)):
+        return {"bytes_sha256": hashlib.sha256(value).hexdigest()}
+    return value
+
+
+def gemini_cached(template: str):
+    """Memoize a Gemini call on its prompt template version and inputs
+
+    Cache misses go through the Gemini circuit breaker. Only successful
+    responses are cached; exceptions propagate uncached.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = canonical_key({
+                "template": template,
+                "version": PROMPT_VERSIONS[template],
+                "model": GEMINI_MODEL,
+                "inputs": {name: _cache_input(v) for name, v in bound.arguments.items()}
+            })
+
+            cache = _get_response_cache()
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+            with get_breaker("gemini").guard():
+                result = func(*args, **kwargs)
+            cache.set(key, result)
+            return result
+
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for the Gemini response cache"""
+    return _get_response_cache().stats()
+
 STORY_PARSER_PROMPT = '''You are a story analyst for visual media production (anime, film, games).
 Analyze the following story and extract:
 
@@ -40,6 +122,7 @@ IMPORTANT:
 '''
 
 
+@gemini_cached("parse_story")
 def parse_story(story_text: str, style: str = "anime") -> dict:
     """Parse a story into characters and scenes using Gemini
 
@@ -50,7 +133,7 @@ def parse_story(story_text: str, style: str = "anime") -> dict:
     Returns:
         Dictionary with characters and scenes
     """
-    model = genai.GenerativeModel('gemini-2.0-flash')
+    model = genai.GenerativeModel(GEMINI_MODEL)
 
     style_context = f"\nTarget visual style: {style}\n"
 
@@ -95,15 +178,11 @@ def generate_story_name(story_text: str) -> str:
     Returns:
         A short creative title (2-4 words)
     """
-    model = genai.GenerativeModel('gemini-2.0-flash')
-
     # Truncate story if too long
     truncated = story_text[:500] if len(story_text) > 500 else story_text
-    prompt = STORY_NAME_PROMPT.replace("{story}", truncated)
 
     try:
-        response = model.generate_content(prompt)
-        name = response.text.strip().strip('"\'')
+        name = _request_story_name(truncated)
         # Ensure it's not too long
         if len(name) > 30:
             name = name[:30]
@@ -112,6 +191,14 @@ def generate_story_name(story_text: str) -> str:
         return "Untitled Story"
 
 
+@gemini_cached("story_name")
+def _request_story_name(story_text: str) -> str:
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    prompt = STORY_NAME_PROMPT.replace("{story}", story_text)
+    response = model.generate_content(prompt)
+    return response.text.strip().strip('"\'')
+
+
 DNA_EXTRACTION_PROMPT = '''Analyze this character image and extract detailed visual features for consistent reproduction.
 
 Return ONLY valid JSON in this exact format:
@@ -160,6 +247,7 @@ Character name: {name}
 '''
 
 
+@gemini_cached("character_dna")
 def extract_character_dna(image_data, character_name: str) -> dict:
     """Extract Character DNA from an image using Gemini Vision
 
@@ -170,9 +258,11 @@ def extract_character_dna(image_data, character_name: str) -> dict:
     Returns:
         Character DNA dictionary
     """
-    model = genai.GenerativeModel('gemini-2.0-flash')
+    model = genai.GenerativeModel(GEMINI_MODEL)
 
     prompt = DNA_EXTRACTION_PROMPT.replace("{name}", character_name)
+    if isinstance(image_data, (bytes, bytearray)):
+        image_data = {"mime_type": image_mime_type(image_data), "data": bytes(image_data)}
 
     response = model.generate_content(
         [prompt, image_data],
@@ -229,29 +319,35 @@ def generate_scene_dialog(scene_description: str, characters: list, format_type:
     Returns:
         List of dialog dictionaries with speaker, text, and type
     """
-    model = genai.GenerativeModel('gemini-2.0-flash')
-
     characters_str = ", ".join(characters) if characters else "Unknown characters"
+
+    try:
+        return _request_scene_dialog(scene_description, characters_str, format_type)
+    except Exception as e:
+        print(f"Error generating dialog: {e}")
+        # Return default dialog
+        return [{"speaker": "NARRATOR", "text": scene_description[:100], "type": "narration"}]
+
+
+@gemini_cached("scene_dialog")
+def _request_scene_dialog(scene_description: str, characters: str, format_type: str) -> list:
+    model = genai.GenerativeModel(GEMINI_MODEL)
+
     prompt = DIALOG_GENERATION_PROMPT.format(
         scene_description=scene_description,
-        characters=characters_str,
+        characters=characters,
         format=format_type
     )
 
-    try:
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                response_mime_type="application/json"
-            )
+    response = model.generate_content(
+        prompt,
+        generation_config=genai.GenerationConfig(
+            response_mime_type="application/json"
         )
+    )
 
-        result = json.loads(response.text)
-        return result.get("dialogs", [])
-    except Exception as e:
-        print(f"Error generating dialog: {e}")
-        # Return default dialog
-        return [{"speaker": "NARRATOR", "text": scene_description[:100], "type": "narration"}]
+    result = json.loads(response.text)
+    return result.get("dialogs", [])
 
 
 # Test
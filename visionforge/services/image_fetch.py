@@ -0,0 +1,401 @@
+"""VisionForge - Shared image fetching with an on-disk, content-addressed cache"""
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from email.utils import formatdate
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+from .result_cache import CACHE_DIR
+
+IMAGE_CACHE_DIR = os.path.expanduser(
+    os.getenv("VISIONFORGE_IMAGE_CACHE_DIR", os.path.join(CACHE_DIR, "images"))
+)
+
+# Cached images younger than this are served without touching the network;
+# older ones are revalidated with If-None-Match / If-Modified-Since
+IMAGE_CACHE_FRESH = float(os.getenv("VISIONFORGE_IMAGE_CACHE_FRESH", str(24 * 60 * 60)))
+# Least recently used images beyond this many bytes are evicted
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("VISIONFORGE_IMAGE_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# (connect, read) timeouts in seconds for every image download
+IMAGE_FETCH_TIMEOUT = (
+    float(os.getenv("IMAGE_FETCH_CONNECT_TIMEOUT", "10")),
+    float(os.getenv("IMAGE_FETCH_READ_TIMEOUT", "60"))
+)
+# Pooled keep-alive connections per host
+IMAGE_FETCH_POOL_SIZE = int(os.getenv("IMAGE_FETCH_POOL_SIZE", "16"))
+# Downloads in flight per host, however many threads are fetching
+IMAGE_FETCH_PER_HOST = int(os.getenv("IMAGE_FETCH_PER_HOST", "6"))
+# Longest a background fetch waits for interactive fetches to finish (seconds)
+BACKGROUND_YIELD_TIMEOUT = 5.0
+
+# Memory budget for decoded images shared between exports
+DECODED_CACHE_MAX_BYTES = int(os.getenv("VISIONFORGE_DECODED_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+
+class ImageCache:
+    """Downloads images once and keeps them on disk
+
+    Image bytes are stored by SHA-256 of their content, so two URLs serving
+    the same image share one file. A SQLite index maps each URL to its
+    content hash and validators (ETag / Last-Modified). Concurrent requests
+    for the same URL wait for a single download, and at most
+    IMAGE_FETCH_PER_HOST downloads run against one host at a time. Background fetches
+    (prefetching) hold off while interactive fetches are in flight.
+    """
+
+    def __init__(self, root: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.max_bytes = max_bytes
+        self.path = os.path.join(root, "index.sqlite3")
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        self._session: Optional[requests.Session] = None
+        self._url_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._foreground = 0
+        self._foreground_idle = threading.Condition(self._lock)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                "url TEXT PRIMARY KEY, sha256 TEXT NOT NULL, size INTEGER NOT NULL, "
+                "etag TEXT, last_modified TEXT, "
+                "checked_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS urls_accessed ON urls (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection wrapped in a transaction, closed afterwards"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive session shared by every download in this process"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=IMAGE_FETCH_POOL_SIZE,
+                pool_maxsize=IMAGE_FETCH_POOL_SIZE
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._session = session
+        return self._session
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def variant_path(self, blob: str, variant: str) -> str:
+        """Where to keep a file derived from a cached blob (evicted with it)"""
+        return f"{blob}~{variant}"
+
+    @contextmanager
+    def _single_flight(self, url: str) -> Iterator[None]:
+        """Hold the URL's lock; the lock is dropped once nobody is waiting on it"""
+        with self._lock:
+            lock, users = self._url_locks.get(url, (threading.Lock(), 0))
+            self._url_locks[url] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, users = self._url_locks[url]
+                if users == 1:
+                    del self._url_locks[url]
+                else:
+                    self._url_locks[url] = (lock, users - 1)
+
+    @contextmanager
+    def _host_slot(self, url: str) -> Iterator[None]:
+        """Hold one of the host's IMAGE_FETCH_PER_HOST download slots"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            slots = self._host_slots.get(host)
+            if slots is None:
+                slots = self._host_slots[host] = threading.BoundedSemaphore(IMAGE_FETCH_PER_HOST)
+        with slots:
+            yield
+
+    def get_path(self, url: str, background: bool = False) -> str:
+        """Local path of the image at `url`, downloading it if needed
+
+        Args:
+            url: Image URL
+            background: Low priority fetch; waits (up to
+                BACKGROUND_YIELD_TIMEOUT) for interactive fetches to finish
+        """
+        if background:
+            with self._foreground_idle:
+                self._foreground_idle.wait_for(
+                    lambda: self._foreground == 0, timeout=BACKGROUND_YIELD_TIMEOUT
+                )
+            with self._single_flight(url):
+                return self._get_path(url)
+
+        with self._lock:
+            self._foreground += 1
+        try:
+            with self._single_flight(url):
+                return self._get_path(url)
+        finally:
+            with self._foreground_idle:
+                self._foreground -= 1
+                self._foreground_idle.notify_all()
+
+    def get_bytes(self, url: str) -> bytes:
+        """Raw image bytes (as served) for `url`"""
+        with open(self.get_path(url), "rb") as f:
+            return f.read()
+
+    def _get_path(self, url: str) -> str:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT sha256, etag, last_modified, checked_at FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row is not None:
+            sha256, etag, last_modified, checked_at = row
+            blob = self._blob_path(sha256)
+            if not os.path.exists(blob):
+                row = None
+            elif now - checked_at < IMAGE_CACHE_FRESH:
+                self._touch(url, now)
+                self.hits += 1
+                return blob
+
+        headers = {}
+        if row is not None:
+            if etag:
+                headers["If-None-Match"] = etag
+            headers["If-Modified-Since"] = last_modified or formatdate(checked_at, usegmt=True)
+
+        try:
+            with self._host_slot(url):
+                response = self.session.get(url, headers=headers, timeout=IMAGE_FETCH_TIMEOUT)
+            if row is not None and response.status_code == 304:
+                self._touch(url, now, checked=True)
+                self.revalidated += 1
+                return blob
+            response.raise_for_status()
+        except requests.RequestException:
+            if row is not None:
+                # Revalidation failed (e.g. an expired signed URL); the cached
+                # copy is still the image the app generated
+                self._touch(url, now)
+                self.hits += 1
+                return blob
+            raise
+
+        self.downloads += 1
+        return self._store(url, response, now)
+
+    def _store(self, url: str, response: requests.Response, now: float) -> str:
+        content = response.content
+        sha256 = hashlib.sha256(content).hexdigest()
+        blob = self._blob_path(sha256)
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            tmp = f"{blob}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(content)
+            os.replace(tmp, blob)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO urls "
+                "(url, sha256, size, etag, last_modified, checked_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, sha256, len(content), response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), now, now)
+            )
+        self._evict()
+        return blob
+
+    def _touch(self, url: str, now: float, checked: bool = False):
+        with self._connect() as conn:
+            if checked:
+                conn.execute(
+                    "UPDATE urls SET accessed_at = ?, checked_at = ? WHERE url = ?", (now, now, url)
+                )
+            else:
+                conn.execute("UPDATE urls SET accessed_at = ? WHERE url = ?", (now, url))
+
+    def _evict(self):
+        """Drop least recently used URLs until the unique blobs fit in max_bytes"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT url, sha256, size FROM urls ORDER BY accessed_at DESC"
+            ).fetchall()
+            kept, total, evicted = set(), 0, []
+            for url, sha256, size in rows:
+                if sha256 in kept:
+                    continue
+                if total + size > self.max_bytes and kept:
+                    evicted.append((url, sha256))
+                    continue
+                kept.add(sha256)
+                total += size
+            for url, _ in evicted:
+                conn.execute("DELETE FROM urls WHERE url = ?", (url,))
+
+        for _, sha256 in evicted:
+            if sha256 not in kept:
+                blob = self._blob_path(sha256)
+                for path in [blob, *glob.glob(glob.escape(blob) + "~*")]:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    def stats(self) -> dict:
+        """Counters for this process and the size of the cache on disk"""
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM urls"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "downloads": self.downloads,
+            "entries": entries,
+            "bytes": size
+        }
+
+
+class DecodedImageCache:
+    """In-memory LRU of decoded images, bounded by their pixel bytes
+
+    Keyed by (content hash, mode), so the same image behind different URLs
+    is decoded and converted once.
+    """
+
+    def __init__(self, max_bytes: int = DECODED_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._images: "OrderedDict[Tuple[str, str], Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, key: Tuple[str, str]) -> Optional[Image.Image]:
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key: Tuple[str, str], image: Image.Image):
+        size = self._size(image)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._images.pop(key, None)
+            if previous is not None:
+                self.resident_bytes -= self._size(previous)
+            self._images[key] = image
+            self.resident_bytes += size
+            while self.resident_bytes > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.resident_bytes -= self._size(evicted)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._images),
+            "resident_bytes": self.resident_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.resident_bytes = 0
+
+
+_image_cache: Optional[ImageCache] = None
+_decoded_cache: Optional[DecodedImageCache] = None
+
+
+def get_image_cache() -> ImageCache:
+    """Process-wide image cache"""
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = ImageCache()
+    return _image_cache
+
+
+def fetch_image_bytes(url: str) -> bytes:
+    """Image bytes for a URL, downloaded at most once while cached"""
+    return get_image_cache().get_bytes(url)
+
+
+def get_decoded_cache() -> DecodedImageCache:
+    """Process-wide cache of decoded images"""
+    global _decoded_cache
+    if _decoded_cache is None:
+        _decoded_cache = DecodedImageCache()
+    return _decoded_cache
+
+
+def fetch_image(url: str, mode: Optional[str] = None) -> Image.Image:
+    """Open the image at a URL as a decoded PIL Image
+
+    Decoded images are shared between callers through the decoded image
+    cache: treat the result as read-only and .copy() it before modifying it
+    in place (paste, thumbnail, draw).
+
+    Args:
+        url: Image URL
+        mode: Convert to this mode (e.g. "RGB"); the converted image is cached
+
+    Returns:
+        PIL Image object
+    """
+    path = get_image_cache().get_path(url)
+    # Blobs are named by content hash
+    key = (os.path.basename(path), mode or "")
+    decoded = get_decoded_cache()
+    image = decoded.get(key)
+    if image is None:
+        image = Image.open(path)
+        image.load()  # reads the pixels and closes the file
+        if mode and image.mode != mode:
+            image = image.convert(mode)
+        decoded.put(key, image)
+    return image
+
+
+def image_cache_stats() -> dict:
+    """Disk and decoded image cache statistics"""
+    return {"disk": get_image_cache().stats(), "decoded": get_decoded_cache().stats()}
@@ -4,9 +4,30 @@ import time
 import os
 from typing import Optional
 
+from .circuit_breaker import get_breaker
+
 # Luma AI Dream Machine API
 LUMA_API_URL = "https://api.lumalabs.ai/dream-machine/v1"
 
+# (connect, read) timeouts in seconds for every Luma request
+LUMA_TIMEOUT = (
+    float(os.getenv("LUMA_CONNECT_TIMEOUT", "10")),
+    float(os.getenv("LUMA_READ_TIMEOUT", "60"))
+)
+
+
+class LumaAPIError(Exception):
+    """Raised when a Luma request or generation fails"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: Optional[bool] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        if retryable is None:
+            # Timeouts and connection errors have no status code; 4xx (e.g. a
+            # bad API key) are the caller's, not Luma's
+            retryable = status_code is None or status_code == 429 or status_code >= 500
+        self.retryable = retryable
+
 
 class LumaVideoService:
     """Luma AI Dream Machine service for image-to-video generation"""
@@ -47,21 +68,34 @@ class LumaVideoService:
         }
 
         # Create generation request
-        response = requests.post(
-            f"{LUMA_API_URL}/generations",
-            headers=self.headers,
-            json=payload
-        )
-
-        if response.status_code != 201:
-            raise Exception(f"Luma API error: {response.text}")
-
-        generation = response.json()
+        generation = self._request("POST", f"{LUMA_API_URL}/generations", 201, json=payload)
         generation_id = generation["id"]
 
         # Poll for completion
         return self._wait_for_completion(generation_id)
 
+    def _request(self, method: str, url: str, expected_status: int, **kwargs) -> dict:
+        """One Luma API request, through the Luma circuit breaker
+
+        Only single requests are guarded, never a whole polling loop, so a
+        half-open probe is released as soon as its request returns.
+        """
+        # Fail fast while Luma is degraded instead of waiting on our own timeout
+        with get_breaker("luma").guard():
+            try:
+                response = requests.request(
+                    method, url, headers=self.headers, timeout=LUMA_TIMEOUT, **kwargs
+                )
+            except requests.Timeout as e:
+                raise LumaAPIError(f"Luma API timed out ({type(e).__name__})") from e
+            except requests.RequestException as e:
+                raise LumaAPIError(f"Luma API connection failed: {e}") from e
+
+            if response.status_code != expected_status:
+                raise LumaAPIError(f"Luma API error: {response.text}", status_code=response.status_code)
+
+            return response.json()
+
     def _wait_for_completion(
         self,
         generation_id: str,
@@ -81,15 +115,7 @@ class LumaVideoService:
         start_time = time.time()
 
         while time.time() - start_time < max_wait:
-            response = requests.get(
-                f"{LUMA_API_URL}/generations/{generation_id}",
-                headers=self.headers
-            )
-
-            if response.status_code != 200:
-                raise Exception(f"Luma API error: {response.text}")
-
-            generation = response.json()
+            generation = self._request("GET", f"{LUMA_API_URL}/generations/{generation_id}", 200)
             state = generation.get("state")
 
             if state == "completed":
@@ -100,12 +126,14 @@ class LumaVideoService:
                     "state": "completed"
                 }
             elif state == "failed":
-                raise Exception(f"Video generation failed: {generation.get('failure_reason')}")
+                raise LumaAPIError(
+                    f"Video generation failed: {generation.get('failure_reason')}", retryable=False
+                )
 
             # Still processing
             time.sleep(poll_interval)
 
-        raise Exception("Video generation timed out")
+        raise LumaAPIError("Video generation timed out", retryable=False)
 
     def download_video(self, video_url: str, output_path: str) -> str:
         """Download generated video to local file
@@ -117,7 +145,8 @@ class LumaVideoService:
         Returns:
             Path to saved video
         """
-        response = requests.get(video_url, stream=True)
+        response = requests.get(video_url, stream=True, timeout=LUMA_TIMEOUT)
+        response.raise_for_status()
 
         with open(output_path, 'wb') as f:
             for chunk in response.iter_content(chunk_size=8192):
@@ -0,0 +1,116 @@
+"""VisionForge - Background prefetch of generated images into the image cache"""
+import itertools
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from .image_fetch import get_image_cache
+
+# Worker threads pulling images in the background
+IMAGE_PREFETCH_WORKERS = int(os.getenv("VISIONFORGE_PREFETCH_WORKERS", "2"))
+
+# Lower runs first
+PRIORITY_PORTRAIT = 0
+PRIORITY_SCENE = 1
+
+
+class ImagePrefetcher:
+    """Downloads images into the shared image cache ahead of need
+
+    URLs are queued by priority and fetched by a few daemon threads as
+    background (low priority) cache requests, so interactive fetches such as
+    exports and DNA extraction go first. The worker count bounds both the
+    downloads and any follow-up work (`then`, e.g. thumbnailing) they run.
+    """
+
+    def __init__(self, workers: int = IMAGE_PREFETCH_WORKERS):
+        self.workers = max(workers, 1)
+        self.fetched = 0
+        self.failed = 0
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._pending: Dict[str, Future] = {}
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._threads: list = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(
+        self,
+        url: str,
+        priority: int = PRIORITY_SCENE,
+        then: Optional[Callable[[str], Any]] = None
+    ) -> Future:
+        """Queue a URL; a URL already queued or being fetched shares that job
+
+        Args:
+            url: Image URL
+            priority: Lower runs first (PRIORITY_PORTRAIT, PRIORITY_SCENE)
+            then: Run on the worker with the URL once the image is cached
+
+        Returns:
+            Future resolving to the result of `then` (None without one)
+        """
+        with self._lock:
+            future = self._pending.get(url)
+            if future is not None:
+                return future
+            future = self._pending[url] = Future()
+            if not self._threads:
+                self._start()
+        self._queue.put((priority, next(self._order), url, then, future))
+        return future
+
+    def _start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"image-prefetch-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            _, _, url, then, future = self._queue.get()
+            try:
+                get_image_cache().get_path(url, background=True)
+                result = then(url) if then is not None else None
+            except Exception as e:
+                self.failed += 1
+                future.set_exception(e)
+            else:
+                self.fetched += 1
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self._pending.pop(url, None)
+                self._queue.task_done()
+
+    def join(self):
+        """Block until everything queued so far has been fetched"""
+        self._queue.join()
+
+    def stats(self) -> dict:
+        return {"fetched": self.fetched, "failed": self.failed, "pending": self.pending}
+
+
+_prefetcher: Optional[ImagePrefetcher] = None
+
+
+def get_prefetcher() -> ImagePrefetcher:
+    """Process-wide prefetcher"""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = ImagePrefetcher()
+    return _prefetcher
+
+
+def prefetch_image(
+    url: str,
+    priority: int = PRIORITY_SCENE,
+    then: Optional[Callable[[str], Any]] = None
+) -> Future:
+    """Start pulling an image into the local cache in the background"""
+    return get_prefetcher().submit(url, priority, then)
@@ -0,0 +1,158 @@
+"""VisionForge - Memoized prompt compilation from Character DNA"""
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from .result_cache import canonical_key
+
+# Compiled character fragments kept in memory (least recently used evicted)
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("VISIONFORGE_PROMPT_CACHE_ENTRIES", "4096"))
+
+CONSISTENCY_KEYWORDS = "consistent character design, same characters throughout"
+
+
+def build_character_description(dna: dict) -> str:
+    """Convert Character DNA JSON to text description for prompt injection
+
+    Args:
+        dna: Character DNA dictionary
+
+    Returns:
+        Text description for use in prompts
+    """
+    parts = []
+
+    # Name
+    if 'name' in dna:
+        parts.append(dna['name'])
+
+    # Physical features
+    if 'physical_features' in dna:
+        pf = dna['physical_features']
+
+        if 'hair' in pf:
+            hair = pf['hair']
+            hair_desc = f"{hair.get('color', '')} {hair.get('style', '')} hair"
+            if hair.get('texture'):
+                hair_desc += f" with {hair['texture']} texture"
+            parts.append(hair_desc)
+
+        if 'eyes' in pf:
+            eyes = pf['eyes']
+            eye_desc = f"{eyes.get('color', '')} {eyes.get('shape', '')} eyes"
+            if eyes.get('features') and eyes['features'] != 'none':
+                eye_desc += f" with {eyes['features']}"
+            parts.append(eye_desc)
+
+        if 'face' in pf:
+            face = pf['face']
+            if 'skin_tone' in face:
+                parts.append(f"{face['skin_tone']} skin")
+            if face.get('distinctive_marks') and face['distinctive_marks'] != 'none':
+                parts.append(face['distinctive_marks'])
+            if 'structure' in face:
+                parts.append(face['structure'])
+
+        if 'body' in pf:
+            body = pf['body']
+            if 'build' in body:
+                parts.append(f"{body['build']} build")
+
+    # Clothing
+    if 'clothing' in dna:
+        clothing = dna['clothing']
+        if 'default_outfit' in clothing:
+            parts.append(f"wearing {clothing['default_outfit']}")
+        if clothing.get('accessories'):
+            acc_list = clothing['accessories']
+            if acc_list and acc_list[0]:
+                parts.append(f"with {', '.join(acc_list)}")
+        if clothing.get('weapons') and clothing['weapons'] != 'none':
+            parts.append(clothing['weapons'])
+
+    return ", ".join(filter(None, parts))
+
+
+def dna_fingerprint(dna: dict) -> str:
+    """Stable fingerprint of a DNA; changes whenever any field changes"""
+    return canonical_key(dna)
+
+
+class PromptCompiler:
+    """Compiles scene prompts from per-character fragments cached by DNA fingerprint
+
+    An edited DNA gets a new fingerprint and is recompiled on next use; every
+    other character's fragment is reused. Hashing a DNA costs more than
+    describing it, so a DNA object seen before is first checked by equality
+    against a snapshot, and only hashed when it is new or has changed.
+    Thread-safe, since prompts are also built from worker threads.
+    """
+
+    def __init__(self, max_entries: int = PROMPT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._fragments: "OrderedDict[str, str]" = OrderedDict()
+        # id(dna) -> (snapshot of the DNA, its fragment)
+        self._seen: "OrderedDict[int, Tuple[dict, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def character_fragment(self, dna: dict) -> str:
+        """Prompt fragment for one character, compiled at most once per DNA version"""
+        with self._lock:
+            seen = self._seen.get(id(dna))
+            if seen is not None and seen[0] == dna:
+                self._seen.move_to_end(id(dna))
+                self.hits += 1
+                return seen[1]
+
+        fingerprint = dna_fingerprint(dna)
+        with self._lock:
+            fragment = self._fragments.get(fingerprint)
+            if fragment is not None:
+                self._fragments.move_to_end(fingerprint)
+                self.hits += 1
+        if fragment is None:
+            fragment = build_character_description(dna)
+            with self._lock:
+                self.misses += 1
+                self._fragments[fingerprint] = fragment
+                self._evict(self._fragments)
+
+        with self._lock:
+            self._seen[id(dna)] = (copy.deepcopy(dna), fragment)
+            self._evict(self._seen)
+        return fragment
+
+    def _evict(self, entries: OrderedDict):
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def scene_prompt(self, scene_description: str, character_dnas: List[dict]) -> str:
+        """Full scene prompt: character fragments, scene, consistency keywords"""
+        fragments = [f for f in map(self.character_fragment, character_dnas) if f]
+        return ", ".join([*fragments, scene_description, CONSISTENCY_KEYWORDS])
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._fragments)
+        }
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+            self._seen.clear()
+
+
+_compiler = PromptCompiler()
+
+
+def get_prompt_compiler() -> PromptCompiler:
+    """Process-wide prompt compiler shared by every session"""
+    return _compiler
@@ -0,0 +1,188 @@
+"""VisionForge - Process-wide rate limiting and admission control for provider calls"""
+import asyncio
+import os
+import sqlite3
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .result_cache import CACHE_DIR
+
+# Bria generation requests per second across all sessions and worker processes
+BRIA_RATE_LIMIT = float(os.getenv("BRIA_RATE_LIMIT", "1"))
+BRIA_RATE_BURST = int(os.getenv("BRIA_RATE_BURST", "5"))
+
+# Use a shared Redis (or Redis-protocol server) instead of the local SQLite bucket
+RATE_LIMIT_REDIS_URL = os.getenv("VISIONFORGE_RATE_LIMIT_REDIS_URL", "")
+
+
+class SQLiteTokenBucket:
+    """Token bucket whose state lives in a local SQLite file
+
+    Every worker process on the host opens the same file, and each
+    acquisition runs in an IMMEDIATE transaction, so the limit is shared.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: int, root: str = CACHE_DIR):
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, "rate_limits.sqlite3")
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS buckets ("
+                    "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+                )
+        finally:
+            conn.close()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.time()
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            tokens, updated_at = row if row else (self.capacity, now)
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.name, tokens, now)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+# Atomic refill-and-take; returns milliseconds to wait (0 when a token was taken)
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return wait
+"""
+
+
+class RedisTokenBucket:
+    """Token bucket shared through Redis, for limits across hosts"""
+
+    def __init__(self, name: str, rate: float, capacity: int, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            # Optional dependency, see requirements.txt
+            raise RuntimeError(
+                "VISIONFORGE_RATE_LIMIT_REDIS_URL is set but the redis package is not installed "
+                "(pip install redis)"
+            ) from e
+
+        self.key = f"visionforge:rate_limit:{name}"
+        self.rate = rate
+        self.capacity = capacity
+        self._redis = redis.Redis.from_url(url)
+        self._script = self._redis.register_script(_REDIS_TOKEN_BUCKET)
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available; returns seconds to wait otherwise"""
+        wait_ms = self._script(keys=[self.key], args=[self.rate, self.capacity, time.time()])
+        return int(wait_ms) / 1000
+
+
+class AdmissionQueue:
+    """FIFO admission in front of a token bucket
+
+    Only the request at the head of the queue competes for tokens. Everyone
+    else waits their turn and is told their position as it changes.
+    """
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self._queue: deque = deque()
+        self._turn: Optional[asyncio.Condition] = None
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    async def acquire(self, on_position: Optional[Callable[[int], None]] = None):
+        """Wait until this request may be sent
+
+        Args:
+            on_position: Called with the number of requests ahead of this one
+                whenever that number changes while queued
+        """
+        if self._turn is None:
+            self._turn = asyncio.Condition()
+
+        ticket = object()
+        self._queue.append(ticket)
+        try:
+            reported = None
+            async with self._turn:
+                while self._queue[0] is not ticket:
+                    position = self._queue.index(ticket)
+                    if on_position and position != reported:
+                        on_position(position)
+                        reported = position
+                    await self._turn.wait()
+
+            # At the head of the queue: wait for a token
+            while True:
+                wait = await asyncio.to_thread(self.bucket.try_acquire)
+                if wait <= 0:
+                    return
+                if on_position and reported != 0:
+                    on_position(0)
+                    reported = 0
+                await asyncio.sleep(wait)
+        finally:
+            self._queue.remove(ticket)
+            async with self._turn:
+                self._turn.notify_all()
+
+
+_bria_admission: Optional[AdmissionQueue] = None
+
+
+def get_bria_admission() -> AdmissionQueue:
+    """Admission queue for Bria generation requests in this process"""
+    global _bria_admission
+    if _bria_admission is None:
+        if RATE_LIMIT_REDIS_URL:
+            bucket = RedisTokenBucket("bria", BRIA_RATE_LIMIT, BRIA_RATE_BURST, RATE_LIMIT_REDIS_URL)
+        else:
+            bucket = SQLiteTokenBucket("bria", BRIA_RATE_LIMIT, BRIA_RATE_BURST)
+        _bria_admission = AdmissionQueue(bucket)
+    return _bria_admission
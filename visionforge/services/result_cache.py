@@ -0,0 +1,107 @@
+"""VisionForge - Persistent, content-addressed result cache (SQLite)"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+CACHE_DIR = os.path.expanduser(os.getenv("VISIONFORGE_CACHE_DIR", "~/.visionforge/cache"))
+
+
+def canonical_key(payload: Any) -> str:
+    """SHA-256 of the canonical JSON form of a payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Disk-backed key/value cache with TTL and size-bounded eviction
+
+    Values must be JSON-serializable. The SQLite file is safe to share
+    between threads and worker processes; a connection is opened per call.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int, root: str = CACHE_DIR):
+        """
+        Args:
+            name: Cache name (one SQLite file per cache)
+            ttl: Seconds before an entry expires
+            max_entries: Least recently used entries beyond this are evicted
+            root: Directory holding the cache files
+        """
+        os.makedirs(root, exist_ok=True)
+        self.path = os.path.join(root, f"{name}.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection wrapped in a transaction, closed afterwards"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value, or None on a miss or expired entry"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        """Store a value and evict expired and least recently used entries"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process and the current entry count"""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
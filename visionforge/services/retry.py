@@ -0,0 +1,165 @@
+"""VisionForge - Retry with jittered backoff and hedged requests for provider calls"""
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How a call site retries and hedges
+
+    Attributes:
+        max_attempts: Total attempts including the first
+        base_delay: Backoff cap for the first retry, doubled per retry (seconds)
+        max_delay: Upper bound on the backoff cap (seconds)
+        hedge: Fire a second identical request when the first runs slow
+        hedge_after: Hedge threshold (seconds) until enough latencies are
+            recorded to use the observed p95
+    """
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 20.0
+    hedge: bool = False
+    hedge_after: float = 45.0
+
+
+def _hedge_enabled(call_site: str) -> bool:
+    return os.getenv(f"BRIA_HEDGE_{call_site.upper()}", "0") == "1"
+
+
+# Per call site policies. Hedging doubles spend on slow calls, so it's opt-in
+# (e.g. BRIA_HEDGE_SCENE=1).
+RETRY_POLICIES: Dict[str, RetryPolicy] = {
+    "default": RetryPolicy(),
+    "portrait": RetryPolicy(max_attempts=3, hedge=_hedge_enabled("portrait"), hedge_after=30.0),
+    "scene": RetryPolicy(max_attempts=3, hedge=_hedge_enabled("scene"), hedge_after=45.0),
+    # Interactive regeneration: fail faster rather than keep the user waiting
+    "regenerate": RetryPolicy(
+        max_attempts=2, max_delay=5.0,
+        hedge=_hedge_enabled("regenerate"), hedge_after=30.0
+    ),
+}
+
+# Minimum recorded latencies before the observed p95 replaces hedge_after
+_MIN_LATENCY_SAMPLES = 20
+
+_latencies: Dict[str, deque] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Errors worth retrying: timeouts, connection resets, 429 and 5xx"""
+    return bool(getattr(error, "retryable", False))
+
+
+def _site_stats(call_site: str) -> Dict[str, int]:
+    return _stats.setdefault(call_site, {
+        "calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0
+    })
+
+
+def _record_latency(call_site: str, seconds: float):
+    _latencies.setdefault(call_site, deque(maxlen=200)).append(seconds)
+
+
+def latency_p95(call_site: str) -> Optional[float]:
+    """Observed p95 latency for a call site, if enough samples exist"""
+    samples = _latencies.get(call_site)
+    if not samples or len(samples) < _MIN_LATENCY_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+
+def retry_stats() -> Dict[str, Dict[str, Any]]:
+    """Call, retry and hedge counters per call site, with observed p95 latency"""
+    return {
+        site: dict(counts, p95_latency=latency_p95(site))
+        for site, counts in _stats.items()
+    }
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[Any]],
+    call_site: str = "default",
+    admit: Optional[Callable[[], Awaitable[None]]] = None
+) -> Any:
+    """Run `call` under the call site's retry and hedging policy
+
+    Args:
+        call: Zero-argument coroutine function; must be safe to repeat
+        call_site: Key into RETRY_POLICIES (portrait, scene, regenerate)
+        admit: Awaited before every request, hedges included (e.g. rate limit
+            admission). Time spent here is not provider latency: it is left
+            out of the recorded latencies and the hedge timer.
+    """
+    policy = RETRY_POLICIES.get(call_site, RETRY_POLICIES["default"])
+    stats = _site_stats(call_site)
+    stats["calls"] += 1
+
+    for attempt in range(1, policy.max_attempts + 1):
+        try:
+            return await _hedged(call, admit, policy, call_site)
+        except Exception as e:
+            if not is_retryable(e) or attempt == policy.max_attempts:
+                stats["failures"] += 1
+                raise
+            stats["retries"] += 1
+            # Full jitter: sleep anywhere up to the exponential cap
+            cap = min(policy.max_delay, policy.base_delay * 2 ** (attempt - 1))
+            await asyncio.sleep(random.uniform(0, cap))
+
+
+async def _hedged(
+    call: Callable[[], Awaitable[Any]],
+    admit: Optional[Callable[[], Awaitable[None]]],
+    policy: RetryPolicy,
+    call_site: str
+) -> Any:
+    primary_admitted = asyncio.Event()
+
+    async def request(admitted: Optional[asyncio.Event] = None):
+        if admit is not None:
+            await admit()
+        if admitted is not None:
+            admitted.set()
+        started = time.monotonic()
+        result = await call()
+        return result, time.monotonic() - started
+
+    primary = asyncio.ensure_future(request(primary_admitted))
+    pending = {primary}
+    try:
+        if policy.hedge:
+            # The hedge timer starts once the primary is admitted
+            admitted = asyncio.ensure_future(primary_admitted.wait())
+            try:
+                await asyncio.wait({primary, admitted}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                admitted.cancel()
+            threshold = latency_p95(call_site) or policy.hedge_after
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if not done:
+                _site_stats(call_site)["hedges"] += 1
+                hedge = asyncio.ensure_future(request())
+                pending = {primary, hedge}
+
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        _site_stats(call_site)["hedge_wins"] += 1
+                    result, latency = task.result()
+                    _record_latency(call_site, latency)
+                    return result
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,32 @@
+"""VisionForge - Retry and cache counters from every service, in one place"""
+import json
+from typing import Any, Dict
+
+
+def service_stats() -> Dict[str, Any]:
+    """Counters of this worker process, keyed by service"""
+    from .gemini_service import cache_stats as gemini_cache_stats
+    from .image_fetch import image_cache_stats
+    from .prompt_compiler import get_prompt_compiler
+    from .retry import retry_stats
+
+    return {
+        "retry": retry_stats(),
+        "images": image_cache_stats(),
+        "gemini": gemini_cache_stats(),
+        "prompts": get_prompt_compiler().stats(),
+    }
+
+
+def log_service_stats(label: str):
+    """Print the current counters as one JSON line (never raises)
+
+    Args:
+        label: What the counters are reported after, e.g. "forge run"
+    """
+    try:
+        stats = json.dumps(service_stats(), sort_keys=True, default=str)
+    except Exception as e:
+        print(f"[stats] {label}: unavailable ({e})")
+        return
+    print(f"[stats] {label}: {stats}")
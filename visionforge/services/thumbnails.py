@@ -0,0 +1,121 @@
+"""VisionForge - Resized WebP variants of generated images for responsive cards"""
+import os
+import threading
+from typing import Dict
+
+from PIL import Image
+
+from .image_fetch import get_image_cache
+
+# Variant widths in pixels; the browser picks one per card via srcset
+THUMBNAIL_WIDTHS = tuple(
+    int(w) for w in os.getenv("VISIONFORGE_THUMB_WIDTHS", "320,640,1280").split(",") if w.strip()
+)
+THUMBNAIL_QUALITY = int(os.getenv("VISIONFORGE_THUMB_QUALITY", "80"))
+# Variant used as the plain `src` fallback
+THUMBNAIL_FALLBACK_WIDTH = 640
+# Size budget of a thumbnail directory; least recently used images go first
+THUMBNAIL_DIR_MAX_BYTES = int(os.getenv("VISIONFORGE_THUMB_DIR_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_evict_lock = threading.Lock()
+
+
+def make_thumbnails(image_url: str, out_dir: str, base_url: str) -> Dict[str, str]:
+    """Write WebP variants of an image (once per image content)
+
+    The original comes from the shared image cache, so it is downloaded at
+    most once and reused by DNA extraction and exports.
+
+    Args:
+        image_url: Remote image URL
+        out_dir: Directory served at base_url
+        base_url: Public URL prefix of out_dir
+
+    Returns:
+        {"thumb_url": fallback variant URL, "srcset": srcset covering the
+        variants and the original}
+    """
+    source = get_image_cache().get_path(image_url)
+    # Cache blobs are named by content hash, so variants are shared by URLs
+    # serving the same image and never go stale
+    content_id = os.path.basename(source)
+    os.makedirs(out_dir, exist_ok=True)
+
+    with Image.open(source) as original:
+        original_width = original.width
+        widths = [w for w in sorted(THUMBNAIL_WIDTHS) if w < original_width]
+        missing = [w for w in widths if not _touch(os.path.join(out_dir, f"{content_id}_{w}.webp"))]
+        if missing:
+            image = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+            # Largest first, each downscaled from the previous: cheaper than
+            # resampling the full-size original every time
+            for width in sorted(missing, reverse=True):
+                height = max(round(image.height * width / image.width), 1)
+                image = image.resize((width, height), Image.Resampling.LANCZOS)
+                path = os.path.join(out_dir, f"{content_id}_{width}.webp")
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                image.save(tmp, "WEBP", quality=THUMBNAIL_QUALITY, method=4)
+                os.replace(tmp, path)
+    if missing:
+        evict_thumbnails(out_dir, keep=content_id)
+
+    urls = {w: f"{base_url}/{content_id}_{w}.webp" for w in widths}
+    srcset = [f"{url} {w}w" for w, url in urls.items()]
+    srcset.append(f"{image_url} {original_width}w")
+    fallback = [w for w in widths if w <= THUMBNAIL_FALLBACK_WIDTH]
+    return {
+        "thumb_url": urls[fallback[-1]] if fallback else image_url,
+        "srcset": ", ".join(srcset)
+    }
+
+
+def _touch(path: str) -> bool:
+    """Mark an existing variant as recently used; False if it doesn't exist"""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def evict_thumbnails(out_dir: str, max_bytes: int = THUMBNAIL_DIR_MAX_BYTES, keep: str = ""):
+    """Delete the least recently used images' variants until out_dir fits in max_bytes
+
+    An image's variants are kept or dropped together, by their latest use
+    (make_thumbnails touches them on reuse). Cards already rendered with
+    evicted variants lose them, so keep the budget well above what open
+    sessions show.
+
+    Args:
+        out_dir: Thumbnail directory
+        max_bytes: Size budget
+        keep: Content id never evicted (the image just thumbnailed)
+    """
+    with _evict_lock:
+        groups: Dict[str, list] = {}  # content id -> [last used, bytes, paths]
+        total = 0
+        with os.scandir(out_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".webp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                group = groups.setdefault(entry.name.rsplit("_", 1)[0], [0.0, 0, []])
+                group[0] = max(group[0], stat.st_mtime)
+                group[1] += stat.st_size
+                group[2].append(entry.path)
+                total += stat.st_size
+
+        for content_id, (_, size, paths) in sorted(groups.items(), key=lambda item: item[1][0]):
+            if total <= max_bytes:
+                break
+            if content_id == keep:
+                continue
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
@@ -1,15 +1,14 @@
 """VisionForge - Video Service for Slideshow Export"""
-import requests
-from io import BytesIO
 from PIL import Image
 import os
 import tempfile
 
+from .image_fetch import fetch_image
+
 
 def download_image_for_video(url: str, output_path: str) -> str:
     """Download image and save locally for video processing"""
-    response = requests.get(url)
-    img = Image.open(BytesIO(response.content)).convert('RGB')
+    img = fetch_image(url, 'RGB')
     img.save(output_path)
     return output_path
 
@@ -147,8 +146,8 @@ def create_slideshow_gif(
 
     for scene in scenes:
         # Download image
-        response = requests.get(scene.image_url)
-        img = Image.open(BytesIO(response.content)).convert('RGB')
+        # Cached images are shared; thumbnail() resizes in place
+        img = fetch_image(scene.image_url, 'RGB').copy()
 
         # Resize to fit resolution while maintaining aspect ratio
         img.thumbnail(resolution, Image.Resampling.LANCZOS)
@@ -0,0 +1,85 @@
+"""VisionForge - Right-sized image payloads for Gemini Vision"""
+import io
+import os
+import threading
+
+from PIL import Image
+
+from .image_fetch import get_image_cache
+
+# Longest edge (pixels) of images sent for DNA extraction. Facial features,
+# hair and outfit details survive well at this size; full-resolution portraits
+# only add upload time and vision latency.
+DNA_IMAGE_MAX_EDGE = int(os.getenv("VISIONFORGE_DNA_IMAGE_EDGE", "1024"))
+DNA_IMAGE_QUALITY = int(os.getenv("VISIONFORGE_DNA_IMAGE_QUALITY", "88"))
+# "JPEG" or "WEBP"
+DNA_IMAGE_FORMAT = os.getenv("VISIONFORGE_DNA_IMAGE_FORMAT", "JPEG").upper()
+
+# Source formats Gemini accepts as-is when they are already small enough
+_PASSTHROUGH_FORMATS = {"JPEG", "WEBP"}
+
+
+def dna_image_bytes(
+    image_url: str,
+    max_edge: int = DNA_IMAGE_MAX_EDGE,
+    quality: int = DNA_IMAGE_QUALITY,
+    image_format: str = DNA_IMAGE_FORMAT
+) -> bytes:
+    """Encoded image for DNA extraction, at most max_edge pixels on its longest side
+
+    The original comes from the shared image cache, so the portrait is not
+    downloaded again. The encoded payload is kept next to the cached original
+    (keyed by its content hash and the encoding settings) and reused on later
+    calls, e.g. when re-extracting or across sessions.
+
+    Args:
+        image_url: Remote image URL
+        max_edge: Longest edge of the payload in pixels
+        quality: JPEG/WebP quality
+        image_format: "JPEG" or "WEBP"
+
+    Returns:
+        Encoded image bytes
+    """
+    cache = get_image_cache()
+    source = cache.get_path(image_url)
+    path = cache.variant_path(source, f"vision_{max_edge}_q{quality}.{image_format.lower()}")
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    with Image.open(source) as original:
+        if original.format in _PASSTHROUGH_FORMATS and max(original.size) <= max_edge:
+            with open(source, "rb") as f:
+                return f.read()
+        # Lets JPEG sources decode straight at a reduced scale
+        original.draft("RGB", (max_edge, max_edge))
+        image = original.convert("RGB")
+    image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, quality=quality)
+    data = buffer.getvalue()
+
+    # Best effort: the payload is still returned if it cannot be kept
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return data
+
+
+def image_mime_type(data: bytes) -> str:
+    """MIME type of encoded image bytes, from their signature"""
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
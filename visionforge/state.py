@@ -2,15 +2,69 @@
 import reflex as rx
 from pydantic import BaseModel
 from typing import List, Dict
+import asyncio
+import bisect
+import functools
 import os
 
+from reflex.constants import Endpoint
+
+from .pipeline import TaskGraph, RUNNING
+from .run_store import RunStore
+
+
+# Max number of characters forged (portrait -> download -> DNA) at once
+CHARACTER_FORGE_CONCURRENCY = int(os.getenv("VISIONFORGE_FORGE_CONCURRENCY", "4"))
+# Max number of scene (and dialog) generations in flight at once
+SCENE_GENERATION_CONCURRENCY = int(os.getenv("VISIONFORGE_SCENE_CONCURRENCY", "4"))
+# How often a bulk regeneration checks whether it was cancelled (seconds)
+REGENERATION_CANCEL_POLL = 0.5
+
+# DNA fields edited as comma-separated text but stored as lists
+DNA_LIST_FIELDS = {"/clothing/accessories"}
+
+# Thumbnails are written under the upload dir, which the backend serves at runtime
+THUMBNAIL_SUBDIR = "thumbs"
+
+
+async def image_thumbnails(image_url: str, priority: int) -> Dict[str, str]:
+    """Local WebP variants of an image as {"thumb_url", "srcset"}
+
+    The image is fetched and thumbnailed by the background prefetcher, so
+    this never competes with interactive fetches. Thumbnails are an
+    optimization, so failures return {} and cards fall back to the original
+    image.
+    """
+    from .services.prefetch import prefetch_image
+    from .services.thumbnails import make_thumbnails
+    try:
+        return await asyncio.wrap_future(prefetch_image(
+            image_url,
+            priority,
+            then=functools.partial(
+                make_thumbnails,
+                out_dir=os.path.join(rx.get_upload_dir(), THUMBNAIL_SUBDIR),
+                base_url=f"{Endpoint.UPLOAD.get_url()}/{THUMBNAIL_SUBDIR}"
+            )
+        ))
+    except Exception as e:
+        print(f"Thumbnails failed for {image_url}: {e}")
+        return {}
+
+
+def queue_reporter(graph: TaskGraph, node_id: str):
+    """on_queue callback showing a node's place in the Bria admission queue as its detail"""
+    def report(ahead: int):
+        detail = f"{ahead} ahead in queue" if ahead else "waiting for rate limit"
+        graph.set_detail(node_id, detail)
+    return report
+
 
 class Character(BaseModel):
     """Character model for type safety"""
     id: str = ""
     name: str = ""
     description: str = ""
-    image_url: str = ""
 
 
 class Scene(BaseModel):
@@ -18,9 +72,38 @@ class Scene(BaseModel):
     id: str = ""
     title: str = ""
     description: str = ""
+
+
+class ImageSet(BaseModel):
+    """A character's or scene's image and its local variants"""
+    image_url: str = ""
+    thumb_url: str = ""  # local WebP variant, see image_thumbnails
+    srcset: str = ""
+
+
+class ExportItem(BaseModel):
+    """A character or scene with its current image, as the export services read it"""
+    id: str = ""
+    name: str = ""
+    title: str = ""
+    description: str = ""
     image_url: str = ""
 
 
+class PipelineNode(BaseModel):
+    """Status of one node in the forge graph"""
+    id: str = ""
+    label: str = ""
+    kind: str = ""
+    status: str = "pending"
+
+
+class ProviderStatus(BaseModel):
+    """Circuit breaker state of an external provider"""
+    name: str = ""
+    state: str = "closed"
+
+
 class Project(BaseModel):
     """Project model for saved projects"""
     id: str = ""
@@ -38,13 +121,25 @@ class State(rx.State):
     # Generated data - using typed models
     characters: List[Character] = []
     scenes: List[Scene] = []
-    character_dnas: Dict[str, dict] = {}
+    # Images by character / scene id. Kept out of the lists so a new image or
+    # its thumbnails only resend these small maps, not every card's text.
+    character_images: Dict[str, ImageSet] = {}
+    scene_images: Dict[str, ImageSet] = {}
+    # Landed images waiting for fetch_pending_images: [kind, id, image_url]
+    _pending_images: List[List[str]] = []
+
+    # Backend only: full DNAs and scene membership never leave the server.
+    # The views render Character/Scene summaries and selected_dna.
+    _character_dnas: Dict[str, dict] = {}
+    _scene_characters: Dict[str, List[str]] = {}  # scene id -> character ids present
 
     # UI state
     is_loading: bool = False
     error_message: str = ""
     current_step: str = ""
     generation_progress: int = 0
+    pipeline_nodes: List[PipelineNode] = []
+    provider_status: List[ProviderStatus] = []
 
     # Export state
     export_loading: bool = False
@@ -145,145 +240,69 @@ class State(rx.State):
 
     def get_selected_character_dna(self) -> dict:
         """Get DNA for selected character"""
-        if self.selected_character_id and self.selected_character_id in self.character_dnas:
-            return self.character_dnas[self.selected_character_id]
+        if self.selected_character_id and self.selected_character_id in self._character_dnas:
+            return self._character_dnas[self.selected_character_id]
         return {}
 
-    @rx.var
-    def selected_dna_name(self) -> str:
-        """Get selected character DNA name"""
-        dna = self.get_selected_character_dna()
-        return dna.get("name", "Unknown")
-
-    @rx.var
-    def selected_dna_hair_color(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("physical_features", {}).get("hair", {}).get("color", "N/A")
-
-    @rx.var
-    def selected_dna_hair_style(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("physical_features", {}).get("hair", {}).get("style", "N/A")
-
-    @rx.var
-    def selected_dna_eye_color(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("physical_features", {}).get("eyes", {}).get("color", "N/A")
-
-    @rx.var
-    def selected_dna_eye_shape(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("physical_features", {}).get("eyes", {}).get("shape", "N/A")
-
-    @rx.var
-    def selected_dna_skin_tone(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("physical_features", {}).get("face", {}).get("skin_tone", "N/A")
-
-    @rx.var
-    def selected_dna_face_structure(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("physical_features", {}).get("face", {}).get("structure", "N/A")
-
-    @rx.var
-    def selected_dna_body_build(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("physical_features", {}).get("body", {}).get("build", "N/A")
-
-    @rx.var
-    def selected_dna_outfit(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("clothing", {}).get("default_outfit", "N/A")
+    # Bumped whenever the selected character's DNA changes, so selected_dna
+    # isn't recomputed for unrelated state changes (progress, other characters)
+    _selected_dna_revision: int = 0
 
-    @rx.var
-    def selected_dna_accessories(self) -> str:
+    @rx.var(cache=True, deps=["selected_character_id", "_selected_dna_revision"], auto_deps=False)
+    def selected_dna(self) -> Dict[str, str]:
+        """Display fields of the selected character's DNA, keyed by field name"""
         dna = self.get_selected_character_dna()
-        accessories = dna.get("clothing", {}).get("accessories", [])
+        physical = dna.get("physical_features", {})
+        hair = physical.get("hair", {})
+        eyes = physical.get("eyes", {})
+        face = physical.get("face", {})
+        clothing = dna.get("clothing", {})
+        accessories = clothing.get("accessories", [])
         if isinstance(accessories, list):
-            return ", ".join(accessories) if accessories else "None"
-        return str(accessories)
-
-    @rx.var
-    def selected_dna_art_style(self) -> str:
-        dna = self.get_selected_character_dna()
-        return dna.get("style_attributes", {}).get("art_style", "N/A")
-
-    # DNA field setters for editable inputs
-    def set_dna_hair_color(self, value: str):
-        self._set_dna_nested("physical_features", "hair", "color", value)
-
-    def set_dna_hair_style(self, value: str):
-        self._set_dna_nested("physical_features", "hair", "style", value)
-
-    def set_dna_eye_color(self, value: str):
-        self._set_dna_nested("physical_features", "eyes", "color", value)
-
-    def set_dna_eye_shape(self, value: str):
-        self._set_dna_nested("physical_features", "eyes", "shape", value)
-
-    def set_dna_skin_tone(self, value: str):
-        self._set_dna_nested("physical_features", "face", "skin_tone", value)
-
-    def set_dna_face_structure(self, value: str):
-        self._set_dna_nested("physical_features", "face", "structure", value)
-
-    def set_dna_body_build(self, value: str):
-        self._set_dna_nested("physical_features", "body", "build", value)
-
-    def set_dna_outfit(self, value: str):
-        self._set_dna_nested("clothing", "default_outfit", None, value)
-
-    def set_dna_accessories(self, value: str):
-        # Convert comma-separated string to list
-        accessories_list = [a.strip() for a in value.split(",") if a.strip()]
-        self._set_dna_nested("clothing", "accessories", None, accessories_list)
-
-    def set_dna_art_style(self, value: str):
-        self._set_dna_nested("style_attributes", "art_style", None, value)
-
-    def _set_dna_nested(self, level1: str, level2: str, level3: str = None, value=None):
-        """Helper to set nested DNA values"""
-        if not self.selected_character_id or self.selected_character_id not in self.character_dnas:
+            accessories = ", ".join(accessories) if accessories else "None"
+        return {
+            "name": dna.get("name", "Unknown"),
+            "hair_color": hair.get("color", "N/A"),
+            "hair_style": hair.get("style", "N/A"),
+            "eye_color": eyes.get("color", "N/A"),
+            "eye_shape": eyes.get("shape", "N/A"),
+            "skin_tone": face.get("skin_tone", "N/A"),
+            "face_structure": face.get("structure", "N/A"),
+            "body_build": physical.get("body", {}).get("build", "N/A"),
+            "outfit": clothing.get("default_outfit", "N/A"),
+            "accessories": str(accessories),
+            "art_style": dna.get("style_attributes", {}).get("art_style", "N/A"),
+        }
+
+    # DNA editing: the editor sends one JSON-patch style "replace" per field
+    def patch_dna(self, path: str, value: str):
+        """Replace one leaf of the selected character's DNA
+
+        Args:
+            path: JSON pointer to the leaf, e.g. "/physical_features/hair/color"
+            value: New text. Comma-separated for list fields (accessories).
+        """
+        char_id = self.selected_character_id
+        if not char_id or char_id not in self._character_dnas:
             return
 
-        # Get a mutable copy of the DNA
-        dna = dict(self.character_dnas[self.selected_character_id])
-
-        # Ensure nested structure exists
-        if level1 not in dna:
-            dna[level1] = {}
-        if isinstance(dna[level1], dict):
-            dna[level1] = dict(dna[level1])
-
-        if level3:
-            # Three levels deep: physical_features.hair.color
-            if level2 not in dna[level1]:
-                dna[level1][level2] = {}
-            if isinstance(dna[level1][level2], dict):
-                dna[level1][level2] = dict(dna[level1][level2])
-            dna[level1][level2][level3] = value
-        else:
-            # Two levels deep: clothing.default_outfit
-            dna[level1][level2] = value
+        *parents, leaf = [part for part in path.split("/") if part]
+        node = self._character_dnas[char_id]
+        for part in parents:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
 
-        # Update the character_dnas dict
-        updated_dnas = dict(self.character_dnas)
-        updated_dnas[self.selected_character_id] = dna
-        self.character_dnas = updated_dnas
+        if path in DNA_LIST_FIELDS:
+            node[leaf] = [item.strip() for item in value.split(",") if item.strip()]
+        else:
+            node[leaf] = value
+        self._selected_dna_revision += 1
+        self._mark_character_edited(char_id)
 
     def update_character_dna_field(self, field_path: str, value: str):
-        """Update a specific field in character DNA"""
-        if self.selected_character_id in self.character_dnas:
-            dna = self.character_dnas[self.selected_character_id]
-            # Parse field path like "physical_features.hair.color"
-            parts = field_path.split(".")
-            current = dna
-            for part in parts[:-1]:
-                if part in current:
-                    current = current[part]
-            if parts[-1] in current:
-                current[parts[-1]] = value
-            self.character_dnas[self.selected_character_id] = dna
+        """Update a specific field in character DNA (dotted path)"""
+        self.patch_dna("/" + field_path.replace(".", "/"), value)
 
     # Scene regeneration
     async def regenerate_scene(self, scene_id: str):
@@ -296,101 +315,246 @@ class State(rx.State):
 
             # Find the scene
             scene_data = None
-            scene_index = -1
-            for i, scene in enumerate(self.scenes):
+            for scene in self.scenes:
                 if scene.id == scene_id:
                     scene_data = scene
-                    scene_index = i
                     break
 
             if not scene_data:
                 return
 
-            # Get character DNAs for this scene
-            scene_char_dnas = list(self.character_dnas.values())
+            # Only the DNAs of the characters in this scene
+            scene_char_dnas = self._scene_dnas(scene_data)
 
-            # Regenerate with same description
-            new_image_url = generate_scene_with_characters(
-                scene_data.description or scene_data.title,
-                scene_char_dnas,
-                self.selected_style.lower()
-            )
+            # Regenerate with same description, asking for a new variation.
+            # A one-node graph, so the card can show its place in the queue.
+            graph = TaskGraph()
+            node_id = f"scene:{scene_id}"
 
-            # Update the scene
-            updated_scene = Scene(
-                id=scene_data.id,
-                title=scene_data.title,
-                description=scene_data.description,
-                image_url=new_image_url
-            )
-            scenes_list = list(self.scenes)
-            scenes_list[scene_index] = updated_scene
-            self.scenes = scenes_list
+            async def regenerate():
+                return await generate_scene_with_characters(
+                    scene_data.description or scene_data.title,
+                    scene_char_dnas,
+                    self.selected_style.lower(),
+                    fresh=True,
+                    on_queue=queue_reporter(graph, node_id),
+                    call_site="regenerate"
+                )
+
+            graph.add(node_id, regenerate, kind="scene", label=scene_data.title)
+            async for node in graph.run():
+                if node.status == RUNNING:
+                    self.current_step = node.detail
+                    yield
+
+            self._patch_scene_image(scene_id, graph.result(node_id))
+            yield State.fetch_pending_images
 
         except Exception as e:
             self.error_message = f"Failed to regenerate scene: {str(e)}"
+            self._refresh_provider_status()
         finally:
             self.regenerating_scene_id = ""
+            self.current_step = ""
 
     regenerating_all_scenes: bool = False
+    regeneration_cancelled: bool = False
+    # Scenes whose characters' DNA changed since their image was generated
+    _stale_scene_ids: List[str] = []
+
+    @rx.var(cache=True)
+    def _scenes_by_character(self) -> Dict[str, List[str]]:
+        """Index of character id -> ids of the scenes that character appears in"""
+        index: Dict[str, List[str]] = {}
+        for scene in self.scenes:
+            for char_id in self._scene_characters.get(scene.id, []):
+                index.setdefault(char_id, []).append(scene.id)
+        return index
 
+    @rx.var
+    def stale_scene_count(self) -> int:
+        """Number of scenes that need regenerating after DNA edits"""
+        scene_ids = {scene.id for scene in self.scenes}
+        return len([s for s in self._stale_scene_ids if s in scene_ids])
+
+    def _scene_dnas(self, scene: Scene) -> List[dict]:
+        """DNAs of the characters present in a scene"""
+        return [
+            self._character_dnas[char_id] for char_id in self._scene_characters.get(scene.id, [])
+            if char_id in self._character_dnas
+        ]
+
+    def _mark_character_edited(self, char_id: str):
+        """Flag every scene the character appears in for regeneration"""
+        stale = list(self._stale_scene_ids)
+        for scene_id in self._scenes_by_character.get(char_id, []):
+            if scene_id not in stale:
+                stale.append(scene_id)
+        self._stale_scene_ids = stale
+
+    @rx.event(background=True)
     async def regenerate_all_scenes_with_dna(self):
-        """Regenerate all scenes with updated DNA"""
-        if not self.scenes:
-            self.error_message = "No scenes to regenerate!"
-            return
-
-        self.regenerating_all_scenes = True
-        self.current_step = "Regenerating scenes with updated DNA..."
-        yield
+        """Regenerate the scenes affected by DNA edits, several at once
+
+        Only scenes whose characters were edited are regenerated (every scene
+        if nothing was edited), each with just its own characters' DNA. Runs
+        in the background so cancel_regeneration is handled while scenes are
+        in flight. Each scene is patched as soon as its image arrives.
+        """
+        async with self:
+            if self.regenerating_all_scenes:
+                return
+            if not self.scenes:
+                self.error_message = "No scenes to regenerate!"
+                return
+            scenes = [s for s in self.scenes if s.id in self._stale_scene_ids] or list(self.scenes)
+            scene_char_dnas = {scene.id: self._scene_dnas(scene) for scene in scenes}
+            self.regenerating_all_scenes = True
+            self.regeneration_cancelled = False
+            self.generation_progress = 0
+            style = self.selected_style.lower()
+            self.current_step = f"Regenerating scenes with updated DNA (0/{len(scenes)})..."
 
+        graph = TaskGraph(limits={"scene": SCENE_GENERATION_CONCURRENCY})
+        watcher = None
         try:
             from .services.fibo_service import generate_scene_with_characters
 
-            scene_char_dnas = list(self.character_dnas.values())
-            total = len(self.scenes)
-
-            for i, scene in enumerate(self.scenes):
-                self.current_step = f"Regenerating scene {i+1}/{total}: {scene.title}..."
-                self.generation_progress = int((i / total) * 100)
-                yield
-
-                # Regenerate with DNA
-                new_image_url = generate_scene_with_characters(
-                    scene.description or scene.title,
-                    scene_char_dnas,
-                    self.selected_style.lower()
-                )
-
-                # Update the scene
-                updated_scene = Scene(
-                    id=scene.id,
-                    title=scene.title,
-                    description=scene.description,
-                    image_url=new_image_url
-                )
-                scenes_list = list(self.scenes)
-                scenes_list[i] = updated_scene
-                self.scenes = scenes_list
-                yield
-
-            self.current_step = "All scenes regenerated!"
-            self.generation_progress = 100
-            yield
+            def add_scene_node(scene: Scene):
+                async def regenerate():
+                    return await generate_scene_with_characters(
+                        scene.description or scene.title,
+                        scene_char_dnas[scene.id],
+                        style,
+                        on_queue=queue_reporter(graph, f"scene:{scene.id}"),
+                        call_site="regenerate"
+                    )
+
+                graph.add(f"scene:{scene.id}", regenerate, kind="scene", label=scene.title)
+
+            for scene in scenes:
+                add_scene_node(scene)
+
+            async def watch_for_cancel():
+                # cancel_regeneration only flips the flag; stop the graph here
+                while True:
+                    await asyncio.sleep(REGENERATION_CANCEL_POLL)
+                    async with self:
+                        if self.regeneration_cancelled:
+                            graph.cancel()
+                            return
+
+            watcher = asyncio.create_task(watch_for_cancel())
+            completed = 0
+            async for node in graph.run():
+                if node.status == RUNNING:
+                    async with self:
+                        self.current_step = f"{node.label}: {node.detail}"
+                    continue
+                completed += 1
+                async with self:
+                    self._patch_scene_image(node.id.partition(":")[2], node.result)
+                    self.current_step = f"Regenerated {completed}/{len(scenes)}: {node.label} ✓"
+                    self.generation_progress = graph.progress()
+                yield State.fetch_pending_images
+
+            async with self:
+                if graph.cancelled:
+                    self.current_step = f"Regeneration cancelled ({completed}/{len(scenes)} scenes updated)"
+                else:
+                    self.current_step = "All scenes regenerated!"
+                    self.generation_progress = 100
 
         except Exception as e:
-            self.error_message = f"Failed to regenerate scenes: {str(e)}"
+            async with self:
+                self.error_message = f"Failed to regenerate scenes: {str(e)}"
+                self._refresh_provider_status()
         finally:
-            self.regenerating_all_scenes = False
-            self.current_step = ""
-            self.generation_progress = 0
+            if watcher is not None:
+                watcher.cancel()
+            async with self:
+                self.regenerating_all_scenes = False
+                self.regeneration_cancelled = False
+                self.current_step = ""
+                self.generation_progress = 0
+
+    def cancel_regeneration(self):
+        """Stop a bulk regeneration; scenes already regenerated are kept"""
+        if self.regenerating_all_scenes:
+            self.regeneration_cancelled = True
+            self.current_step = "Cancelling regeneration..."
+
+    # In-place updates. Mutating through Reflex's proxy marks the var dirty
+    # without copying and reassigning it. The character and scene lists only
+    # change when a card is added; image updates touch the image maps alone.
+    def _append_character(self, character: Character, image_url: str):
+        """Append a finished character"""
+        self.character_images[character.id] = ImageSet(image_url=image_url)
+        self._pending_images.append(["character", character.id, image_url])
+        self.characters.append(character)
+
+    def _insert_scene(self, scene: Scene, image_url: str, scene_rank: Dict[str, int]):
+        """Insert a scene at its story position"""
+        self.scene_images[scene.id] = ImageSet(image_url=image_url)
+        self._pending_images.append(["scene", scene.id, image_url])
+        rank = scene_rank.get(scene.id, len(scene_rank))
+        position = bisect.bisect_right(
+            self.scenes, rank, key=lambda s: scene_rank.get(s.id, len(scene_rank))
+        )
+        self.scenes.insert(position, scene)
+
+    def _patch_scene_image(self, scene_id: str, image_url: str):
+        """Swap in a scene's new image, leaving the scenes list untouched"""
+        if scene_id in self._stale_scene_ids:
+            self._stale_scene_ids = [s for s in self._stale_scene_ids if s != scene_id]
+        self.scene_images[scene_id] = ImageSet(image_url=image_url)
+        self._pending_images.append(["scene", scene_id, image_url])
+
+    def _patch_thumbnails(self, kind: str, item_id: str, image_url: str, thumbnails: Dict[str, str]):
+        """Attach thumbnails to the character or scene they were made for
+
+        Skipped when the item is gone or has a newer image since.
+        """
+        images = self.character_images if kind == "character" else self.scene_images
+        current = images.get(item_id)
+        if thumbnails and current is not None and current.image_url == image_url:
+            images[item_id] = current.model_copy(update=thumbnails)
+
+    @rx.event(background=True)
+    async def fetch_pending_images(self):
+        """Fetch and thumbnail the images that landed since the last call
+
+        Yielded by the handlers that land images. The work runs on the
+        low-priority prefetcher, off the forge and regeneration paths, and
+        each card gets its thumbnails as soon as they are ready.
+        """
+        from .services.prefetch import PRIORITY_PORTRAIT, PRIORITY_SCENE
+
+        async with self:
+            pending, self._pending_images = self._pending_images, []
+
+        async def fetch(kind: str, item_id: str, image_url: str):
+            priority = PRIORITY_PORTRAIT if kind == "character" else PRIORITY_SCENE
+            thumbnails = await image_thumbnails(image_url, priority)
+            async with self:
+                self._patch_thumbnails(kind, item_id, image_url, thumbnails)
+
+        await asyncio.gather(*(fetch(*job) for job in pending))
+
+    def _export_items(self, items: list, images: Dict[str, ImageSet]) -> List[ExportItem]:
+        """Characters or scenes joined with their current image URLs"""
+        return [
+            ExportItem(
+                **item.model_dump(),
+                image_url=images[item.id].image_url if item.id in images else ""
+            )
+            for item in items
+        ]
 
     # Dialog overlay methods
     def set_scene_dialog(self, scene_id: str, dialog: str):
         """Set dialog text for a scene"""
-        dialogs = dict(self.scene_dialogs)
-        dialogs[scene_id] = dialog
-        self.scene_dialogs = dialogs
+        self.scene_dialogs[scene_id] = dialog
 
     def open_dialog_editor(self, scene_id: str):
         """Open dialog editor for a scene"""
@@ -427,20 +591,27 @@ class State(rx.State):
             # Get character names for context
             character_names = [c.name for c in self.characters]
 
-            for scene in self.scenes:
-                self.current_step = f"Generating dialog for: {scene.title}..."
-                yield
+            # Every scene's dialog is an independent node, so they run in parallel
+            graph = TaskGraph(limits={"dialog": SCENE_GENERATION_CONCURRENCY})
 
-                # Generate dialog for this scene
-                dialogs = generate_scene_dialog(
-                    scene.description or scene.title,
-                    character_names,
-                    format_type
-                )
+            def add_dialog_node(scene: Scene):
+                async def dialog():
+                    return await asyncio.to_thread(
+                        generate_scene_dialog,
+                        scene.description or scene.title,
+                        character_names,
+                        format_type
+                    )
+
+                graph.add(f"dialog:{scene.id}", dialog, kind="dialog", label=f"Dialog: {scene.title}")
 
+            for scene in self.scenes:
+                add_dialog_node(scene)
+
+            async for node in graph.run():
                 # Format dialogs as text
                 dialog_text = ""
-                for d in dialogs:
+                for d in node.result:
                     if d.get("type") == "narration":
                         dialog_text += f"[{d.get('text', '')}]\n\n"
                     elif d.get("type") == "thought":
@@ -449,16 +620,22 @@ class State(rx.State):
                         dialog_text += f"{d.get('speaker', '')}: \"{d.get('text', '')}\"\n\n"
 
                 # Save to scene_dialogs
-                self.set_scene_dialog(scene.id, dialog_text.strip())
+                self.set_scene_dialog(node.id.partition(":")[2], dialog_text.strip())
+                self.current_step = f"{node.label} ✓"
+                self._sync_pipeline(graph)
+                yield
 
             self.current_step = "Dialogs generated!"
             yield
 
         except Exception as e:
             self.error_message = f"Failed to generate dialogs: {str(e)}"
+            self._refresh_provider_status()
         finally:
             self.generating_dialogs = False
             self.current_step = ""
+            self.generation_progress = 0
+            self.pipeline_nodes = []
 
     async def generate_manga_dialogs(self):
         """Generate manga-style dialogs"""
@@ -518,7 +695,7 @@ class State(rx.State):
             self.expanded_story_id = ""
         else:
             self.expanded_story_id = story_id
-            self.current_project_id = story_id
+            self._set_current_project(story_id)
 
     def open_new_story_dialog(self):
         """Open new story dialog"""
@@ -540,12 +717,9 @@ class State(rx.State):
             story=""
         )
         self.projects = self.projects + [new_project]
-        self.current_project_id = new_id
+        self._set_current_project(new_id)
         self.expanded_story_id = new_id
         self.story_text = ""
-        self.characters = []
-        self.scenes = []
-        self.character_dnas = {}
         self.show_new_story_dialog = False
         self.new_story_name = ""
         self.active_view = "main"
@@ -560,12 +734,9 @@ class State(rx.State):
             story=""
         )
         self.projects = self.projects + [new_project]
-        self.current_project_id = new_id
+        self._set_current_project(new_id)
         self.expanded_story_id = new_id
         self.story_text = ""
-        self.characters = []
-        self.scenes = []
-        self.character_dnas = {}
         self.show_new_story_dialog = False
         self.new_story_name = ""
         self.active_view = "main"
@@ -587,11 +758,8 @@ class State(rx.State):
         project_id = self.delete_target_id
         self.projects = [p for p in self.projects if p.id != project_id]
         if self.current_project_id == project_id:
-            self.current_project_id = ""
+            self._set_current_project("")
             self.story_text = ""
-            self.characters = []
-            self.scenes = []
-            self.character_dnas = {}
         self.show_delete_dialog = False
         self.delete_target_id = ""
         self.delete_target_name = ""
@@ -600,11 +768,8 @@ class State(rx.State):
         """Delete a story by ID (legacy - now uses confirmation)"""
         self.projects = [p for p in self.projects if p.id != project_id]
         if self.current_project_id == project_id:
-            self.current_project_id = ""
+            self._set_current_project("")
             self.story_text = ""
-            self.characters = []
-            self.scenes = []
-            self.character_dnas = {}
 
     # Example stories
     EXAMPLE_STORIES: Dict[str, str] = {
@@ -638,14 +803,53 @@ Their journey takes them through an enchanted forest where trees whisper secrets
         style = self.selected_style
         self.story_text = self.EXAMPLE_STORIES.get(style, self.EXAMPLE_STORIES["Anime"])
 
-    def clear_results(self):
-        """Clear all generated results"""
+    def _sync_pipeline(self, graph: TaskGraph):
+        """Publish per-node status and progress from the forge graph"""
+        self.pipeline_nodes = [
+            PipelineNode(id=node.id, label=node.label, kind=node.kind, status=node.status)
+            for node in graph.nodes.values()
+        ]
+        self.generation_progress = graph.progress()
+        self._refresh_provider_status()
+
+    def _refresh_provider_status(self):
+        """Publish each provider's circuit breaker state"""
+        from .services.circuit_breaker import breaker_states
+        self.provider_status = [
+            ProviderStatus(name=name, state=state)
+            for name, state in breaker_states().items()
+        ]
+
+    def _reset_story_results(self):
+        """Drop the characters and scenes of the current story, backend state included"""
         self.characters = []
         self.scenes = []
-        self.character_dnas = {}
+        self.character_images = {}
+        self.scene_images = {}
+        self._character_dnas = {}
+        self._scene_characters = {}
+        self._selected_dna_revision += 1
+        self._stale_scene_ids = []
+        self._pending_images = []
+
+    def _set_current_project(self, project_id: str, keep_results: bool = False):
+        """Make project_id the current project
+
+        Every change of current_project_id goes through here. Results belong
+        to the story they were generated from, so switching to another
+        project drops them unless keep_results says they belong to it.
+        """
+        if project_id != self.current_project_id and not keep_results:
+            self._reset_story_results()
+        self.current_project_id = project_id
+
+    def clear_results(self):
+        """Clear all generated results"""
+        self._reset_story_results()
         self.error_message = ""
         self.current_step = ""
         self.generation_progress = 0
+        self.pipeline_nodes = []
 
     # Project management
     def new_project(self):
@@ -657,17 +861,14 @@ Their journey takes them through an enchanted forest where trees whisper secrets
             story=""
         )
         self.projects = self.projects + [new_project]
-        self.current_project_id = new_id
+        self._set_current_project(new_id)
         self.story_text = ""
-        self.characters = []
-        self.scenes = []
-        self.character_dnas = {}
 
     def load_project(self, project_id: str):
         """Load a saved project"""
         for p in self.projects:
             if p.id == project_id:
-                self.current_project_id = project_id
+                self._set_current_project(project_id)
                 self.story_text = p.story
                 break
 
@@ -691,7 +892,7 @@ Their journey takes them through an enchanted forest where trees whisper secrets
         try:
             from .services.export_service import export_manga
             output_dir = os.path.expanduser("~/Downloads")
-            path = export_manga(self.scenes, output_dir)
+            path = export_manga(self._export_items(self.scenes, self.scene_images), output_dir)
             self.export_progress = f"Saved to: {path}"
         except Exception as e:
             self.error_message = f"Export failed: {e}"
@@ -713,7 +914,7 @@ Their journey takes them through an enchanted forest where trees whisper secrets
         try:
             from .services.export_service import export_manhwa
             output_dir = os.path.expanduser("~/Downloads")
-            path = export_manhwa(self.scenes, output_dir)
+            path = export_manhwa(self._export_items(self.scenes, self.scene_images), output_dir)
             self.export_progress = f"Saved to: {path}"
         except Exception as e:
             self.error_message = f"Export failed: {e}"
@@ -735,7 +936,7 @@ Their journey takes them through an enchanted forest where trees whisper secrets
         try:
             from .services.video_service import export_slideshow
             output_dir = os.path.expanduser("~/Downloads")
-            path = export_slideshow(self.scenes, output_dir)
+            path = export_slideshow(self._export_items(self.scenes, self.scene_images), output_dir)
             self.export_progress = f"Saved to: {path}"
         except ImportError:
             self.error_message = "moviepy not installed. Install with: pip install moviepy"
@@ -772,12 +973,13 @@ Their journey takes them through an enchanted forest where trees whisper secrets
                 self.export_progress = msg
 
             path = export_luma_video(
-                self.scenes, api_key, output_dir,
+                self._export_items(self.scenes, self.scene_images), api_key, output_dir,
                 progress_callback=progress_callback
             )
             self.export_progress = f"Saved to: {path}"
         except Exception as e:
             self.error_message = f"Export failed: {e}"
+            self._refresh_provider_status()
             import traceback
             traceback.print_exc()
         finally:
@@ -796,7 +998,11 @@ Their journey takes them through an enchanted forest where trees whisper secrets
         try:
             from .services.export_service import export_all_images
             output_dir = os.path.expanduser("~/Downloads")
-            path = export_all_images(self.scenes, self.characters, output_dir)
+            path = export_all_images(
+                self._export_items(self.scenes, self.scene_images),
+                self._export_items(self.characters, self.character_images),
+                output_dir
+            )
             self.export_progress = f"Saved to: {path}"
         except Exception as e:
             self.error_message = f"Export failed: {e}"
@@ -805,138 +1011,225 @@ Their journey takes them through an enchanted forest where trees whisper secrets
         finally:
             self.export_loading = False
 
+    def _apply_story_name(self, story_name: str):
+        """Name the current project (or create one) once the AI title arrives"""
+        # Check if we have a current project to update
+        if self.current_project_id:
+            # Update existing project with AI-generated name
+            updated_projects = []
+            for p in self.projects:
+                if p.id == self.current_project_id:
+                    updated_projects.append(Project(
+                        id=p.id,
+                        name=story_name,
+                        story=self.story_text
+                    ))
+                else:
+                    updated_projects.append(p)
+            self.projects = updated_projects
+            self.expanded_story_id = self.current_project_id
+        else:
+            # Create new project
+            new_id = f"project_{len(self.projects) + 1}_{story_name.replace(' ', '_')}"
+            new_project = Project(
+                id=new_id,
+                name=story_name,
+                story=self.story_text
+            )
+            self.projects = self.projects + [new_project]
+            # The run's results belong to the project it just named
+            self._set_current_project(new_id, keep_results=True)
+            self.expanded_story_id = new_id
+
+    # Checkpointed generation runs
+    _last_run_id: str = ""
+    can_resume: bool = False
+
     async def generate_story(self):
         """Main generation pipeline"""
         if not self.story_text.strip():
             self.error_message = "Please enter a story first!"
             return
 
+        store = RunStore.create({
+            "story_text": self.story_text,
+            "style": self.selected_style,
+            "project_id": self.current_project_id,
+        })
+        self._last_run_id = store.run_id
+        async for _ in self._forge(store):
+            yield
+
+    async def resume_generation(self):
+        """Resume the last failed run from its first incomplete step"""
+        store = RunStore.load(self._last_run_id)
+        if store is None or store.is_complete:
+            self.can_resume = False
+            self.error_message = "Nothing to resume - start a new generation."
+            return
+
+        self.story_text = store.meta.get("story_text", self.story_text)
+        self.selected_style = store.meta.get("style", self.selected_style)
+        project_id = store.meta.get("project_id", "")
+        if any(p.id == project_id for p in self.projects):
+            self._set_current_project(project_id)
+        async for _ in self._forge(store):
+            yield
+
+    async def _forge(self, store: RunStore):
+        """Run the forge graph, checkpointing every finished step to the run store"""
         self.is_loading = True
+        self.can_resume = False
         self.clear_results()
-        self.current_step = "Naming your story..."
+        self.current_step = "Analyzing story with AI..."
         yield
 
+        graph = None
         try:
             # Import services
             from .services.gemini_service import parse_story, extract_character_dna, generate_story_name
             from .services.fibo_service import (
                 generate_character_portrait,
                 generate_scene_with_characters,
-                download_image,
                 build_character_description
             )
-
-            # Step 0: Generate story name and update/create project
-            story_name = generate_story_name(self.story_text)
-
-            # Check if we have a current project to update
-            if self.current_project_id:
-                # Update existing project with AI-generated name
-                updated_projects = []
-                for p in self.projects:
-                    if p.id == self.current_project_id:
-                        updated_projects.append(Project(
-                            id=p.id,
-                            name=story_name,
-                            story=self.story_text
-                        ))
-                    else:
-                        updated_projects.append(p)
-                self.projects = updated_projects
-                self.expanded_story_id = self.current_project_id
-            else:
-                # Create new project
-                new_id = f"project_{len(self.projects) + 1}_{story_name.replace(' ', '_')}"
-                new_project = Project(
-                    id=new_id,
-                    name=story_name,
-                    story=self.story_text
-                )
-                self.projects = self.projects + [new_project]
-                self.current_project_id = new_id
-                self.expanded_story_id = new_id
-            yield
-
-            # Step 1: Parse story with Gemini
-            self.current_step = "Analyzing story with AI..."
-            self.generation_progress = 10
-            yield
-
-            parsed = parse_story(self.story_text, self.selected_style.lower())
-            total_chars = len(parsed.get("characters", []))
-            total_scenes = len(parsed.get("scenes", []))
-
-            # Step 2: Generate characters and extract DNA
-            self.current_step = "Creating characters..."
-            self.generation_progress = 20
-            yield
-
-            for i, char_data in enumerate(parsed.get("characters", [])):
-                self.current_step = f"Forging {char_data['name']}... ({i+1}/{total_chars})"
-                self.generation_progress = 20 + int((i / max(total_chars, 1)) * 30)
-                yield
-
-                # Generate initial character portrait
-                image_url = generate_character_portrait(
-                    char_data['description'],
-                    self.selected_style.lower()
-                )
-
-                # Extract Character DNA from the generated image
-                image = download_image(image_url)
-                dna = extract_character_dna(image, char_data['name'])
-                self.character_dnas[char_data['id']] = dna
-
-                # Add to state using typed model
-                new_char = Character(
-                    id=char_data['id'],
-                    name=char_data['name'],
-                    description=char_data['description'],
-                    image_url=image_url
-                )
-                self.characters = self.characters + [new_char]
-                yield
-
-            # Step 3: Generate scenes with consistent characters
-            self.current_step = "Generating scenes..."
-            self.generation_progress = 50
+            from .services.vision_input import dna_image_bytes
+
+            # Run the forge graph. Naming runs alongside parsing so it never
+            # delays portraits; each scene starts as soon as the DNAs of its
+            # characters_present are ready.
+            style = self.selected_style.lower()
+            story_text = self.story_text
+            graph = TaskGraph(limits={
+                "portrait": CHARACTER_FORGE_CONCURRENCY,
+                "scene": SCENE_GENERATION_CONCURRENCY,
+            }, store=store)
+            chars_by_id: Dict[str, dict] = {}
+            scenes_by_id: Dict[str, dict] = {}
+            scene_rank: Dict[str, int] = {}  # scene id -> position in the story
+
+            async def name():
+                return await asyncio.to_thread(generate_story_name, story_text)
+
+            async def parse():
+                return await asyncio.to_thread(parse_story, story_text, style)
+
+            def add_character_nodes(char_data: dict):
+                char_id = char_data['id']
+
+                async def portrait():
+                    # Generate initial character portrait
+                    return await generate_character_portrait(
+                        char_data['description'],
+                        style,
+                        on_queue=queue_reporter(graph, f"portrait:{char_id}")
+                    )
+
+                async def dna():
+                    # Extract Character DNA from a downscaled copy of the portrait
+                    image = await asyncio.to_thread(dna_image_bytes, graph.result(f"portrait:{char_id}"))
+                    return await asyncio.to_thread(extract_character_dna, image, char_data['name'])
+
+                graph.add(f"portrait:{char_id}", portrait, kind="portrait",
+                          label=f"Portrait: {char_data['name']}")
+                graph.add(f"dna:{char_id}", dna, deps=[f"portrait:{char_id}"], kind="dna",
+                          label=f"DNA: {char_data['name']}")
+
+            def add_scene_node(scene_data: dict):
+                dna_deps = [
+                    f"dna:{char_id}" for char_id in scene_data.get("characters_present", [])
+                    if char_id in chars_by_id
+                ]
+
+                async def scene():
+                    # Generate scene with locked character features
+                    return await generate_scene_with_characters(
+                        scene_data['visual_direction'],
+                        [graph.result(dep) for dep in dna_deps],
+                        style,
+                        on_queue=queue_reporter(graph, f"scene:{scene_data['id']}")
+                    )
+
+                graph.add(f"scene:{scene_data['id']}", scene, deps=dna_deps, kind="scene",
+                          label=f"Scene: {scene_data['title']}")
+
+            # Naming is off the critical path, so it doesn't count toward progress
+            graph.add("name", name, kind="name", label="Naming story", weight=0)
+            graph.add("parse", parse, kind="parse", label="Analyzing story")
+            self._sync_pipeline(graph)
             yield
 
-            for i, scene_data in enumerate(parsed.get("scenes", [])):
-                self.current_step = f"Scene {i+1}: {scene_data['title']}..."
-                self.generation_progress = 50 + int((i / max(total_scenes, 1)) * 45)
-                yield
-
-                # Get Character DNAs for characters in this scene
-                scene_char_dnas = []
-                for char_id in scene_data.get("characters_present", []):
-                    if char_id in self.character_dnas:
-                        scene_char_dnas.append(self.character_dnas[char_id])
-
-                # Generate scene with locked character features
-                image_url = generate_scene_with_characters(
-                    scene_data['visual_direction'],
-                    scene_char_dnas,
-                    self.selected_style.lower()
-                )
-
-                # Add to state using typed model
-                new_scene = Scene(
-                    id=scene_data['id'],
-                    title=scene_data['title'],
-                    description=scene_data.get('description', ''),
-                    image_url=image_url
-                )
-                self.scenes = self.scenes + [new_scene]
-                yield
-
+            async for node in graph.run():
+                kind, _, item_id = node.id.partition(":")
+
+                if node.status == RUNNING:
+                    self.current_step = f"{node.label}: {node.detail}"
+                    self._sync_pipeline(graph)
+                    yield
+                    continue
+
+                if kind == "name":
+                    self._apply_story_name(node.result)
+
+                elif kind == "parse":
+                    for char_data in node.result.get("characters", []):
+                        chars_by_id[char_data['id']] = char_data
+                        add_character_nodes(char_data)
+                    for scene_data in node.result.get("scenes", []):
+                        scenes_by_id[scene_data['id']] = scene_data
+                        scene_rank[scene_data['id']] = len(scene_rank)
+                        add_scene_node(scene_data)
+
+                elif kind == "dna":
+                    char_data = chars_by_id[item_id]
+                    self._character_dnas[item_id] = node.result
+                    if item_id == self.selected_character_id:
+                        self._selected_dna_revision += 1
+
+                    # Add to state as soon as its chain finishes
+                    new_char = Character(
+                        id=item_id,
+                        name=char_data['name'],
+                        description=char_data['description']
+                    )
+                    self._append_character(new_char, graph.result(f"portrait:{item_id}"))
+
+                elif kind == "scene":
+                    scene_data = scenes_by_id[item_id]
+                    new_scene = Scene(
+                        id=item_id,
+                        title=scene_data['title'],
+                        description=scene_data.get('description', '')
+                    )
+                    self._scene_characters[item_id] = [
+                        char_id for char_id in scene_data.get('characters_present', [])
+                        if char_id in chars_by_id
+                    ]
+                    # Scenes land out of order; keep them in story order
+                    self._insert_scene(new_scene, node.result, scene_rank)
+
+                self.current_step = f"{node.label} ✓"
+                self._sync_pipeline(graph)
+                # Thumbnails for cards that just landed are made in the background
+                yield State.fetch_pending_images if self._pending_images else None
+
+            store.mark_complete()
             self.current_step = "Complete!"
             self.generation_progress = 100
 
         except Exception as e:
             self.error_message = f"Error: {str(e)}"
+            if graph is not None:
+                # Final statuses: the failed node and the ones cancelled with it
+                self._sync_pipeline(graph)
+            self._refresh_provider_status()
+            self.can_resume = True
             import traceback
             traceback.print_exc()
 
         finally:
             self.is_loading = False
+
+        # One line of retry and cache counters per run, for tuning
+        from .services.service_stats import log_service_stats
+        await asyncio.to_thread(log_service_stats, "forge run")
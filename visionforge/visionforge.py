@@ -1,6 +1,9 @@
 """VisionForge - Electric Violet Theme with Sidebar"""
 import reflex as rx
-from .state import State, Character, Scene
+from .state import State, Character, Scene, PipelineNode, ProviderStatus
+
+# Pause in typing before a DNA edit is sent to the server (ms)
+DNA_EDIT_DEBOUNCE_MS = 400
 
 # Electric Violet Theme Colors
 THEME = {
@@ -531,6 +534,23 @@ def delete_confirm_dialog() -> rx.Component:
     )
 
 
+def responsive_image(image, sizes: str, **props) -> rx.Component:
+    """rx.image that lets the browser pick a local WebP variant via srcset
+
+    Falls back to the original image until its thumbnails exist.
+
+    Args:
+        image: The item's ImageSet, e.g. State.scene_images[scene.id]
+    """
+    return rx.image(
+        src=rx.cond(image.thumb_url != "", image.thumb_url, image.image_url),
+        src_set=image.srcset,
+        sizes=sizes,
+        loading="lazy",
+        **props,
+    )
+
+
 def scene_preview_modal() -> rx.Component:
     """Modal for viewing scene in full size"""
     return rx.dialog.root(
@@ -561,8 +581,9 @@ def scene_preview_modal() -> rx.Component:
                 # Image
                 rx.cond(
                     State.scenes.length() > 0,
-                    rx.image(
-                        src=State.scenes[State.preview_scene_index].image_url,
+                    responsive_image(
+                        State.scene_images[State.scenes[State.preview_scene_index].id],
+                        "(max-width: 900px) 100vw, 900px",
                         width="100%",
                         max_height="60vh",
                         object_fit="contain",
@@ -637,8 +658,9 @@ def manga_preview_modal() -> rx.Component:
                     rx.hstack(
                         rx.foreach(
                             State.scenes[:4],
-                            lambda scene: rx.image(
-                                src=scene.image_url,
+                            lambda scene: responsive_image(
+                                State.scene_images[scene.id],
+                                "120px",
                                 width="120px",
                                 height="80px",
                                 object_fit="cover",
@@ -720,8 +742,9 @@ def manhwa_preview_modal() -> rx.Component:
                     rx.vstack(
                         rx.foreach(
                             State.scenes[:3],
-                            lambda scene: rx.image(
-                                src=scene.image_url,
+                            lambda scene: responsive_image(
+                                State.scene_images[scene.id],
+                                "150px",
                                 width="100%",
                                 height="60px",
                                 object_fit="cover",
@@ -774,8 +797,12 @@ def manhwa_preview_modal() -> rx.Component:
     )
 
 
-def dna_field_editable(label: str, value, icon: str, on_change) -> rx.Component:
-    """An editable DNA field with full text visibility"""
+def dna_field_editable(label: str, value, icon: str, path: str) -> rx.Component:
+    """An editable DNA field with full text visibility
+
+    Keystrokes are buffered client-side; once typing pauses, only the field's
+    path and new text are sent to State.patch_dna.
+    """
     return rx.vstack(
         rx.hstack(
             rx.icon(icon, size=14, color=THEME["primary"]),
@@ -783,25 +810,28 @@ def dna_field_editable(label: str, value, icon: str, on_change) -> rx.Component:
             spacing="2",
             align="center",
         ),
-        rx.text_area(
-            value=value,
-            size="1",
-            resize="vertical",
-            style={
-                "width": "100%",
-                "min_height": "50px",
-                "background": THEME["surface"],
-                "border": f"1px solid {THEME['border']}",
-                "border_radius": "6px",
-                "color": THEME["text"],
-                "font_size": "12px",
-                "padding": "8px",
-                "&:focus": {
-                    "border_color": THEME["primary"],
-                    "box_shadow": f"0 0 0 2px {THEME['primary_light']}",
+        rx.debounce_input(
+            rx.text_area(
+                value=value,
+                size="1",
+                resize="vertical",
+                style={
+                    "width": "100%",
+                    "min_height": "50px",
+                    "background": THEME["surface"],
+                    "border": f"1px solid {THEME['border']}",
+                    "border_radius": "6px",
+                    "color": THEME["text"],
+                    "font_size": "12px",
+                    "padding": "8px",
+                    "&:focus": {
+                        "border_color": THEME["primary"],
+                        "box_shadow": f"0 0 0 2px {THEME['primary_light']}",
+                    },
                 },
-            },
-            on_change=on_change,
+                on_change=lambda text: State.patch_dna(path, text),
+            ),
+            debounce_timeout=DNA_EDIT_DEBOUNCE_MS,
         ),
         spacing="1",
         width="100%",
@@ -842,7 +872,7 @@ def character_editor_modal() -> rx.Component:
                 rx.hstack(
                     rx.icon("dna", size=28, color=THEME["secondary"]),
                     rx.vstack(
-                        rx.heading(State.selected_dna_name, size="5", color=THEME["text"]),
+                        rx.heading(State.selected_dna["name"], size="5", color=THEME["text"]),
                         rx.text("Character DNA Profile", size="1", color=THEME["text_muted"]),
                         spacing="0",
                         align="start",
@@ -865,36 +895,36 @@ def character_editor_modal() -> rx.Component:
                     rx.vstack(
                         # Hair Section
                         dna_section("Hair", "sparkles", [
-                            dna_field_editable("Color", State.selected_dna_hair_color, "palette", State.set_dna_hair_color),
-                            dna_field_editable("Style", State.selected_dna_hair_style, "scissors", State.set_dna_hair_style),
+                            dna_field_editable("Color", State.selected_dna["hair_color"], "palette", "/physical_features/hair/color"),
+                            dna_field_editable("Style", State.selected_dna["hair_style"], "scissors", "/physical_features/hair/style"),
                         ]),
 
                         # Eyes Section
                         dna_section("Eyes", "eye", [
-                            dna_field_editable("Color", State.selected_dna_eye_color, "palette", State.set_dna_eye_color),
-                            dna_field_editable("Shape", State.selected_dna_eye_shape, "scan", State.set_dna_eye_shape),
+                            dna_field_editable("Color", State.selected_dna["eye_color"], "palette", "/physical_features/eyes/color"),
+                            dna_field_editable("Shape", State.selected_dna["eye_shape"], "scan", "/physical_features/eyes/shape"),
                         ]),
 
                         # Face Section
                         dna_section("Face", "user", [
-                            dna_field_editable("Skin Tone", State.selected_dna_skin_tone, "palette", State.set_dna_skin_tone),
-                            dna_field_editable("Structure", State.selected_dna_face_structure, "scan", State.set_dna_face_structure),
+                            dna_field_editable("Skin Tone", State.selected_dna["skin_tone"], "palette", "/physical_features/face/skin_tone"),
+                            dna_field_editable("Structure", State.selected_dna["face_structure"], "scan", "/physical_features/face/structure"),
                         ]),
 
                         # Body Section
                         dna_section("Body", "person-standing", [
-                            dna_field_editable("Build", State.selected_dna_body_build, "ruler", State.set_dna_body_build),
+                            dna_field_editable("Build", State.selected_dna["body_build"], "ruler", "/physical_features/body/build"),
                         ]),
 
                         # Clothing Section
                         dna_section("Clothing", "shirt", [
-                            dna_field_editable("Outfit", State.selected_dna_outfit, "shirt", State.set_dna_outfit),
-                            dna_field_editable("Accessories", State.selected_dna_accessories, "gem", State.set_dna_accessories),
+                            dna_field_editable("Outfit", State.selected_dna["outfit"], "shirt", "/clothing/default_outfit"),
+                            dna_field_editable("Accessories", State.selected_dna["accessories"], "gem", "/clothing/accessories"),
                         ]),
 
                         # Style Section
                         dna_section("Art Style", "brush", [
-                            dna_field_editable("Style", State.selected_dna_art_style, "palette", State.set_dna_art_style),
+                            dna_field_editable("Style", State.selected_dna["art_style"], "palette", "/style_attributes/art_style"),
                         ]),
 
                         spacing="3",
@@ -929,7 +959,11 @@ def character_editor_modal() -> rx.Component:
                     rx.dialog.close(
                         rx.button(
                             rx.icon("refresh-cw", size=16),
-                            "Regenerate All Scenes",
+                            rx.cond(
+                                State.stale_scene_count > 0,
+                                f"Regenerate {State.stale_scene_count} Affected Scene(s)",
+                                "Regenerate All Scenes",
+                            ),
                             loading=State.regenerating_all_scenes,
                             style={
                                 "background": THEME["gradient_button"],
@@ -942,15 +976,7 @@ def character_editor_modal() -> rx.Component:
                     width="100%",
                 ),
                 # Progress indicator
-                rx.cond(
-                    State.regenerating_all_scenes,
-                    rx.vstack(
-                        rx.text(State.current_step, size="1", color=THEME["text_muted"]),
-                        rx.progress(value=State.generation_progress, width="100%"),
-                        spacing="2",
-                        width="100%",
-                    ),
-                ),
+                regeneration_progress(),
                 spacing="4",
                 width="100%",
             ),
@@ -965,6 +991,33 @@ def character_editor_modal() -> rx.Component:
     )
 
 
+def regeneration_progress() -> rx.Component:
+    """Progress of a bulk scene regeneration, with a cancel button"""
+    return rx.cond(
+        State.regenerating_all_scenes,
+        rx.vstack(
+            rx.hstack(
+                rx.text(State.current_step, size="1", color=THEME["text_muted"]),
+                rx.spacer(),
+                rx.button(
+                    rx.icon("x", size=14),
+                    "Cancel",
+                    size="1",
+                    variant="soft",
+                    color_scheme="red",
+                    disabled=State.regeneration_cancelled,
+                    on_click=State.cancel_regeneration,
+                ),
+                width="100%",
+                align="center",
+            ),
+            rx.progress(value=State.generation_progress, width="100%"),
+            spacing="2",
+            width="100%",
+        ),
+    )
+
+
 def dialog_editor_modal() -> rx.Component:
     """Modal for editing scene dialog text - Light theme"""
     return rx.dialog.root(
@@ -1068,6 +1121,7 @@ def characters_view() -> rx.Component:
     return rx.box(
         rx.vstack(
             view_header("users", "Characters", "Click on a character to view and edit their DNA"),
+            regeneration_progress(),
             rx.cond(
                 State.characters.length() > 0,
                 rx.hstack(
@@ -1075,8 +1129,9 @@ def characters_view() -> rx.Component:
                         State.characters,
                         lambda char: rx.box(
                             rx.vstack(
-                                rx.image(
-                                    src=char.image_url,
+                                responsive_image(
+                                    State.character_images[char.id],
+                                    "280px",
                                     width="100%",
                                     height="250px",
                                     object_fit="cover",
@@ -1137,6 +1192,7 @@ def scenes_view() -> rx.Component:
     return rx.box(
         rx.vstack(
             view_header("film", "Scenes", "Click regenerate to create a new version of any scene"),
+            regeneration_progress(),
             rx.cond(
                 State.scenes.length() > 0,
                 rx.vstack(
@@ -1144,8 +1200,9 @@ def scenes_view() -> rx.Component:
                         State.scenes,
                         lambda scene: rx.box(
                             rx.hstack(
-                                rx.image(
-                                    src=scene.image_url,
+                                responsive_image(
+                                    State.scene_images[scene.id],
+                                    "300px",
                                     width="300px",
                                     height="200px",
                                     object_fit="cover",
@@ -1173,6 +1230,11 @@ def scenes_view() -> rx.Component:
                                         ),
                                         spacing="2",
                                     ),
+                                    # Queue position while this scene waits for the rate limit
+                                    rx.cond(
+                                        State.regenerating_scene_id == scene.id,
+                                        rx.text(State.current_step, size="1", color=THEME["text_muted"]),
+                                    ),
                                     spacing="3",
                                     flex="1",
                                     align="start",
@@ -1218,8 +1280,9 @@ def manga_panel_with_dialog(scene, dialog: str) -> rx.Component:
     return rx.vstack(
         # Image container with grayscale filter
         rx.box(
-            rx.image(
-                src=scene.image_url,
+            responsive_image(
+                State.scene_images[scene.id],
+                "(max-width: 768px) 100vw, 50vw",
                 width="100%",
                 height="280px",
                 object_fit="cover",
@@ -1352,8 +1415,9 @@ def manhwa_panel_with_dialog(scene, dialog: str) -> rx.Component:
     """Manhwa panel with speech bubble overlay"""
     return rx.box(
         # Full color image
-        rx.image(
-            src=scene.image_url,
+        responsive_image(
+            State.scene_images[scene.id],
+            "(max-width: 800px) 100vw, 800px",
             width="100%",
             height="400px",
             object_fit="cover",
@@ -1519,13 +1583,35 @@ def header() -> rx.Component:
 
 # ============== MAIN COMPONENTS ==============
 
+def pipeline_node_badge(node: PipelineNode) -> rx.Component:
+    """Badge for one node of the forge graph"""
+    return rx.badge(
+        node.label,
+        color_scheme=rx.match(
+            node.status,
+            ("done", "green"),
+            ("running", "violet"),
+            ("failed", "red"),
+            ("cancelled", "orange"),
+            "gray",
+        ),
+        variant=rx.cond(node.status == "pending", "outline", "soft"),
+        size="1",
+    )
+
+
 def progress_indicator() -> rx.Component:
-    """Show generation progress"""
+    """Show generation progress (and where a failed run stopped)"""
     return rx.cond(
-        State.is_loading,
+        State.is_loading | State.can_resume,
         rx.vstack(
             rx.text(State.current_step, size="2", color=THEME["text_muted"]),
             rx.progress(value=State.generation_progress, width="100%"),
+            rx.flex(
+                rx.foreach(State.pipeline_nodes, pipeline_node_badge),
+                wrap="wrap",
+                spacing="1",
+            ),
             width="100%",
             spacing="2",
             padding_top="1em",
@@ -1624,6 +1710,22 @@ def story_input() -> rx.Component:
                     },
                     on_click=State.generate_story,
                 ),
+                rx.cond(
+                    State.can_resume & ~State.is_loading,
+                    rx.button(
+                        rx.icon("rotate-ccw", size=18),
+                        "Resume",
+                        variant="outline",
+                        size="3",
+                        style={
+                            "border": f"2px solid {THEME['secondary']}",
+                            "color": THEME["secondary"],
+                            "border_radius": "10px",
+                            "font_weight": "500",
+                        },
+                        on_click=State.resume_generation,
+                    ),
+                ),
                 width="100%",
                 spacing="3",
                 flex_wrap="wrap",
@@ -1668,9 +1770,10 @@ def character_card(character: Character) -> rx.Component:
     return rx.box(
         rx.vstack(
             rx.cond(
-                character.image_url != "",
-                rx.image(
-                    src=character.image_url,
+                State.character_images[character.id].image_url != "",
+                responsive_image(
+                    State.character_images[character.id],
+                    "(max-width: 768px) 50vw, 240px",
                     width="100%",
                     height="200px",
                     object_fit="cover",
@@ -1730,9 +1833,10 @@ def scene_card(scene: Scene, index: int) -> rx.Component:
     return rx.box(
         rx.vstack(
             rx.cond(
-                scene.image_url != "",
-                rx.image(
-                    src=scene.image_url,
+                State.scene_images[scene.id].image_url != "",
+                responsive_image(
+                    State.scene_images[scene.id],
+                    "(max-width: 768px) 100vw, 320px",
                     width="100%",
                     height="160px",
                     object_fit="cover",
@@ -1804,6 +1908,28 @@ def error_banner() -> rx.Component:
     )
 
 
+def provider_status_badge(provider: ProviderStatus) -> rx.Component:
+    """Warning for a provider whose circuit breaker is not closed"""
+    return rx.cond(
+        provider.state != "closed",
+        rx.callout(
+            rx.cond(
+                provider.state == "open",
+                f"{provider.name} is unavailable - requests are failing fast until it recovers.",
+                f"{provider.name} is recovering - probing with the next request.",
+            ),
+            icon="plug-zap",
+            color="amber",
+            width="100%",
+        ),
+    )
+
+
+def provider_status_banner() -> rx.Component:
+    """Circuit breaker state of degraded providers"""
+    return rx.foreach(State.provider_status, provider_status_badge)
+
+
 def export_status() -> rx.Component:
     """Export progress status"""
     return rx.cond(
@@ -1844,6 +1970,9 @@ def main_content() -> rx.Component:
             # Error banner
             error_banner(),
 
+            # Degraded providers
+            provider_status_banner(),
+
             # Export status
             export_status(),
 